@@ -0,0 +1,186 @@
+"""Time each stage of the ledgerize pipeline on synthetic statements.
+
+Usage::
+
+    python benchmarks/run.py --sizes 10000 100000 --out bench.json
+    python benchmarks/run.py --sizes 10000 --baseline bench.json
+
+With ``--baseline`` the run exits with status 1 when a stage is slower than
+the baseline by more than ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from ledgerize import vault  # noqa: E402
+from ledgerize.config import load_accounts, load_rules  # noqa: E402
+from ledgerize.db import Database  # noqa: E402
+from ledgerize.dedupe import dedupe  # noqa: E402
+from ledgerize.normalize import finalize  # noqa: E402
+from ledgerize.parsers import parse_file  # noqa: E402
+from ledgerize.report import build_report  # noqa: E402
+from ledgerize.rules import apply_rules  # noqa: E402
+
+from synth import generate_set  # noqa: E402
+
+STAGES = [
+    "parse",
+    "finalize",
+    "apply_rules",
+    "dedupe",
+    "ingest_dataframe",
+    "export",
+    "build_report",
+    "vault_lock",
+    "vault_unlock",
+]
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_size(rows: int, work: Path, repeat: int, compact: bool) -> Dict[str, float]:
+    """Return the best wall time in seconds of every stage for ``rows`` rows."""
+    data = work / "input"
+    out = work / "out"
+    out.mkdir(parents=True, exist_ok=True)
+    paths = generate_set(data, rows)
+    accounts = load_accounts(ROOT / "samples/accounts.yml")
+    rules = load_rules(ROOT / "samples/rules.yml")
+    key = os.urandom(32)
+    timings: Dict[str, float] = {}
+    state: Dict[str, Any] = {}
+
+    def parse() -> None:
+        frames = [parse_file(p, accounts, "EUR", compact=compact) for p in paths]
+        state["df"] = pd.concat(frames, ignore_index=True)
+
+    def refinalize() -> None:
+        raw = state["df"].drop(columns=["norm_desc", "id", "raw_source"])
+        finalize(raw, source="bench", compact=compact)
+
+    def rules_stage() -> None:
+        state["categorized"] = apply_rules(state["df"], rules)
+
+    def ingest() -> None:
+        Database(out / "ledgerize.db", merge=False).ingest_dataframe(
+            state["categorized"]
+        )
+
+    stages: Dict[str, Callable[[], Any]] = {
+        "parse": parse,
+        "finalize": refinalize,
+        "apply_rules": rules_stage,
+        "dedupe": lambda: dedupe(state["categorized"]),
+        "ingest_dataframe": ingest,
+        "export": lambda: Database(out / "ledgerize.db").export(
+            state["categorized"], out
+        ),
+        "build_report": lambda: build_report(
+            state["categorized"].copy(), work / "report" / "index.html"
+        ),
+        "vault_lock": lambda: vault.lock(out, work / "bench.lzvault", key),
+        "vault_unlock": lambda: vault.unlock(
+            work / "bench.lzvault", work / "unlocked", key
+        ),
+    }
+    for name in STAGES:
+        timings[name] = _best(stages[name], repeat)
+        print(f"{rows:>10} {name:<18} {timings[name]:9.3f}s", file=sys.stderr)
+    return timings
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+    min_delta: float,
+) -> List[str]:
+    """Return one message per stage slower than ``baseline`` beyond tolerance."""
+    regressions = []
+    for size, stages in current["results"].items():
+        base_stages = baseline.get("results", {}).get(size, {})
+        for stage, seconds in stages.items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            if seconds > base * (1 + threshold) and seconds - base > min_delta:
+                regressions.append(
+                    f"{size} rows / {stage}: {base:.3f}s -> {seconds:.3f}s "
+                    f"(+{(seconds / base - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ledgerize stages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--out", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Results JSON to compare to")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.01,
+        help="Ignore slowdowns smaller than this many seconds",
+    )
+    ns = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "repeat": ns.repeat,
+            "compact": ns.compact,
+        },
+        "results": {},
+    }
+    for rows in ns.sizes:
+        with tempfile.TemporaryDirectory(prefix="ledgerize-bench-") as tmp:
+            results["results"][str(rows)] = run_size(
+                rows, Path(tmp), ns.repeat, ns.compact
+            )
+
+    text = json.dumps(results, indent=2)
+    if ns.out:
+        ns.out.write_text(text)
+    else:
+        print(text)
+
+    if ns.baseline:
+        baseline = json.loads(ns.baseline.read_text())
+        regressions = compare(results, baseline, ns.threshold, ns.min_delta)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
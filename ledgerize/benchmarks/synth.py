@@ -0,0 +1,173 @@
+"""Generate synthetic bank statements for benchmarking.
+
+Statements mimic the formats understood by the N26 and generic parsers and
+contain exact duplicates, near-duplicate descriptions (distance <= 2 on the
+normalized text) and merchants matched by ``samples/rules.yml``.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# (description, typical amount); rule-matching merchants come first.
+MERCHANTS = [
+    ("CARREFOUR MARKET", -45.0),
+    ("MONOPRIX PARIS 11", -23.0),
+    ("SALARY ACME CORP", 2500.0),
+    ("AMAZON EU SARL", -35.0),
+    ("UBER TRIP", -14.0),
+    ("NETFLIX.COM", -13.49),
+    ("SNCF INTERNET", -62.0),
+    ("BOULANGERIE DU COIN", -4.2),
+    ("EDF CLIENTS PARTICULIERS", -78.0),
+    ("PHARMACIE CENTRALE", -18.5),
+    ("Café Zoé", -3.8),
+    ("VIREMENT LOYER", -950.0),
+]
+ACCOUNTS = {"n26": ["DE123"], "generic": ["ACC1", "ACC2"]}
+CHUNK = 1_000_000
+
+
+def _near_duplicate(desc: str, rng: np.random.Generator) -> str:
+    variants = [desc + ".", desc.lower(), desc + " *", desc[:-1]]
+    return variants[int(rng.integers(len(variants)))]
+
+
+def _frame(rows: int, fmt: str, rng: np.random.Generator, start: int) -> pd.DataFrame:
+    merchant = rng.integers(len(MERCHANTS), size=rows)
+    base = np.array([m[1] for m in MERCHANTS])[merchant]
+    amount = np.round(base * rng.uniform(0.5, 1.5, size=rows), 2)
+    days = rng.integers(0, 3 * 365, size=rows)
+    dates = pd.Timestamp("2022-01-01") + pd.to_timedelta(days, unit="D")
+    accounts = ACCOUNTS[fmt]
+    return pd.DataFrame(
+        {
+            "date": dates.strftime("%Y-%m-%d"),
+            "description": np.array([m[0] for m in MERCHANTS], dtype=object)[merchant],
+            "amount": amount,
+            "account": np.array(accounts, dtype=object)[
+                rng.integers(len(accounts), size=rows)
+            ],
+            "currency": "EUR",
+        },
+        index=pd.RangeIndex(start, start + rows),
+    )
+
+
+def _with_duplicates(
+    df: pd.DataFrame, dup_rate: float, near_rate: float, rng: np.random.Generator
+) -> pd.DataFrame:
+    n_dup = int(len(df) * dup_rate)
+    n_near = int(len(df) * near_rate)
+    dups = df.sample(n=n_dup, random_state=rng)
+    near = df.sample(n=n_near, random_state=rng).copy()
+    near["description"] = [_near_duplicate(d, rng) for d in near["description"]]
+    out = pd.concat([df, dups, near])
+    return out.sort_values("date", kind="stable")
+
+
+def _write(df: pd.DataFrame, path: Path, fmt: str, header: bool) -> None:
+    mode = "w" if header else "a"
+    if fmt == "n26":
+        df = df.rename(
+            columns={
+                "date": "Date",
+                "description": "Payee",
+                "account": "Account",
+                "amount": "Amount",
+                "currency": "Currency",
+            }
+        )[["Date", "Payee", "Account", "Amount", "Currency"]]
+        df.to_csv(path, sep=";", index=False, header=header, mode=mode)
+    else:
+        df.to_csv(path, index=False, header=header, mode=mode)
+
+
+def generate(
+    out_dir: Path,
+    rows: int,
+    fmt: str = "n26",
+    seed: int = 0,
+    dup_rate: float = 0.02,
+    near_rate: float = 0.02,
+    name: str = "",
+) -> Path:
+    """Write a statement of roughly ``rows`` rows and return its path.
+
+    Rows are produced in chunks so 10M-row files do not need to fit in
+    memory at once.
+    """
+    rng = np.random.default_rng(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{fmt}_{name or rows}.csv"
+    base_rows = max(1, int(rows / (1 + dup_rate + near_rate)))
+    written = 0
+    while written < base_rows:
+        size = min(CHUNK, base_rows - written)
+        df = _with_duplicates(_frame(size, fmt, rng, written), dup_rate, near_rate, rng)
+        _write(df, path, fmt, header=written == 0)
+        written += size
+    return path
+
+
+def generate_set(
+    out_dir: Path,
+    rows: int,
+    seed: int = 0,
+    dup_rate: float = 0.02,
+    near_rate: float = 0.02,
+) -> List[Path]:
+    """Write one N26 and one generic statement sharing ``rows`` rows."""
+    rates = {"dup_rate": dup_rate, "near_rate": near_rate}
+    return [
+        generate(out_dir, rows // 2, "n26", seed=seed, name=str(rows), **rates),
+        generate(
+            out_dir,
+            rows - rows // 2,
+            "generic",
+            seed=seed + 1,
+            name=str(rows),
+            **rates,
+        ),
+    ]
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--format", choices=["n26", "generic", "both"], default="both")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dup-rate", type=float, default=0.02)
+    parser.add_argument("--near-rate", type=float, default=0.02)
+    ns = parser.parse_args(argv)
+    if ns.format == "both":
+        paths = generate_set(
+            ns.out_dir,
+            ns.rows,
+            seed=ns.seed,
+            dup_rate=ns.dup_rate,
+            near_rate=ns.near_rate,
+        )
+    else:
+        paths = [
+            generate(
+                ns.out_dir,
+                ns.rows,
+                ns.format,
+                seed=ns.seed,
+                dup_rate=ns.dup_rate,
+                near_rate=ns.near_rate,
+            )
+        ]
+    for path in paths:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
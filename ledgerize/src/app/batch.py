@@ -0,0 +1,202 @@
+"""Run a manifest of validated commands concurrently.
+
+A manifest is either a JSON list whose items are argument lists or objects
+``{"cmd": [...], "timeout": 60, "retries": 1}``, or a text file with one
+shell-quoted command per line (blank lines and ``#`` comments are ignored).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import shlex
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from . import cli_safe
+
+logger = logging.getLogger(__name__)
+
+# Characters of stdout/stderr kept per command in the aggregated result.
+OUTPUT_TAIL = 4000
+
+
+@dataclass
+class BatchCommand:
+    cmd: List[str]
+    timeout: Optional[float] = None
+    retries: Optional[int] = None
+
+
+@dataclass
+class BatchResult:
+    cmd: List[str]
+    returncode: Optional[int] = None
+    duration_s: float = 0.0
+    attempts: int = 0
+    timed_out: bool = False
+    error: Optional[str] = None
+    stdout: str = ""
+    stderr: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+@dataclass
+class BatchReport:
+    results: List[BatchResult] = field(default_factory=list)
+    duration_s: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": len(self.results),
+            "succeeded": sum(r.ok for r in self.results),
+            "failed": sum(not r.ok for r in self.results),
+            "duration_s": self.duration_s,
+            "results": [asdict(r) for r in self.results],
+        }
+
+
+def load_manifest(path: Path) -> List[BatchCommand]:
+    """Parse a JSON or line-based manifest into commands."""
+    text = path.read_text()
+    if path.suffix == ".json":
+        commands = []
+        for item in json.loads(text):
+            if isinstance(item, dict):
+                commands.append(
+                    BatchCommand(
+                        list(item["cmd"]), item.get("timeout"), item.get("retries")
+                    )
+                )
+            else:
+                commands.append(BatchCommand(list(item)))
+        return commands
+    return [
+        BatchCommand(shlex.split(line))
+        for line in text.splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+
+def validate_commands(commands: List[BatchCommand]) -> Dict[int, str]:
+    """Resolve aliases in place and return validation errors by index.
+
+    Subcommands are listed once per distinct binary.
+    """
+    known: Dict[str, Set[str]] = {}
+    errors: Dict[int, str] = {}
+    for idx, command in enumerate(commands):
+        if not command.cmd:
+            errors[idx] = "empty command"
+            continue
+        binary, args = command.cmd[0], command.cmd[1:]
+        if not args:
+            continue
+        try:
+            if binary not in known:
+                known[binary] = cli_safe.list_subcommands(binary)
+            subcmd = cli_safe.resolve_alias(binary, args[0])
+            cli_safe.check_subcommand(binary, subcmd, known[binary])
+        except (RuntimeError, ValueError) as exc:
+            errors[idx] = str(exc)
+            continue
+        command.cmd[1] = subcmd
+    return errors
+
+
+async def _run_one(
+    command: BatchCommand,
+    semaphore: asyncio.Semaphore,
+    timeout: Optional[float],
+    retries: int,
+) -> BatchResult:
+    result = BatchResult(command.cmd)
+    timeout = command.timeout if command.timeout is not None else timeout
+    retries = command.retries if command.retries is not None else retries
+    async with semaphore:
+        start = time.perf_counter()
+        for attempt in range(1, retries + 2):
+            result.attempts = attempt
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *command.cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except OSError as exc:
+                result.error = str(exc)
+                break
+            try:
+                out, err = await asyncio.wait_for(proc.communicate(), timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                result.returncode, result.timed_out = None, True
+                result.error = f"timed out after {timeout}s"
+            else:
+                result.returncode, result.timed_out, result.error = (
+                    proc.returncode,
+                    False,
+                    None,
+                )
+                result.stdout = out.decode(errors="replace")[-OUTPUT_TAIL:]
+                result.stderr = err.decode(errors="replace")[-OUTPUT_TAIL:]
+            if result.ok:
+                break
+            logger.info("Attempt %d failed: %s", attempt, " ".join(command.cmd))
+        result.duration_s = time.perf_counter() - start
+    return result
+
+
+async def _run_all(
+    commands: List[BatchCommand], jobs: int, timeout: Optional[float], retries: int
+) -> List[BatchResult]:
+    semaphore = asyncio.Semaphore(jobs)
+    return await asyncio.gather(
+        *(_run_one(c, semaphore, timeout, retries) for c in commands)
+    )
+
+
+def run_batch(
+    commands: List[BatchCommand],
+    *,
+    jobs: int = 4,
+    timeout: Optional[float] = None,
+    retries: int = 0,
+    dry_run: bool = False,
+) -> BatchReport:
+    """Validate ``commands`` and run the valid ones with bounded concurrency.
+
+    Parameters
+    ----------
+    commands: List[BatchCommand]
+        Commands to run; the first argument after the binary is validated as
+        a subcommand, like :func:`app.cli_safe.run_cli` does.
+    jobs: int
+        Maximum number of commands running at the same time.
+    timeout: float, optional
+        Default per-command timeout in seconds (None disables it).
+    retries: int
+        Default number of retries for commands that fail or time out.
+    dry_run: bool
+        If True, only validate; valid commands are reported with code 0.
+    """
+    start = time.perf_counter()
+    errors = validate_commands(commands)
+    runnable = [c for i, c in enumerate(commands) if i not in errors]
+    if dry_run:
+        done = [BatchResult(c.cmd, returncode=0) for c in runnable]
+    else:
+        done = asyncio.run(_run_all(runnable, jobs, timeout, retries))
+    finished = iter(done)
+    results = [
+        BatchResult(c.cmd, error=errors[i]) if i in errors else next(finished)
+        for i, c in enumerate(commands)
+    ]
+    return BatchReport(results, time.perf_counter() - start)
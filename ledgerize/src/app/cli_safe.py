@@ -2,17 +2,27 @@
 
 from __future__ import annotations
 
+import json
 import logging
 import os
 import re
+import shutil
 import subprocess
+import sys
+import threading
+from collections import deque
+from pathlib import Path
 from subprocess import CompletedProcess
-from typing import Iterable, Sequence, Set
+from typing import IO, Any, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 from .cli_aliases import ALIASES
 
 logger = logging.getLogger(__name__)
 
+CACHE_VERSION = 1
+# In-process memo keyed by (resolved path, mtime_ns, size).
+_MEMO: Dict[Tuple[str, int, int], Set[str]] = {}
+
 
 def _run_help(binary: str) -> str:
     """Return the combined stdout/stderr of ``binary --help``."""
@@ -61,9 +71,7 @@ def _iter_command_blocks(text: str) -> Iterable[Sequence[str]]:
             yield block
 
 
-def list_subcommands(binary: str) -> Set[str]:
-    """Return the set of available subcommands for ``binary``."""
-    help_text = _run_help(binary)
+def _parse_subcommands(help_text: str) -> Set[str]:
     subcommands: Set[str] = set()
     pattern = re.compile(r"^\s{2,}([\w-]+)(\s{2,}|$)")
     for block in _iter_command_blocks(help_text):
@@ -76,6 +84,91 @@ def list_subcommands(binary: str) -> Set[str]:
     return subcommands
 
 
+def cache_path() -> Path:
+    """Return the on-disk subcommand cache location.
+
+    ``APP_CACHE_DIR`` overrides the directory; otherwise ``$XDG_CACHE_HOME/app``
+    or ``~/.cache/app`` is used.
+    """
+    base = os.environ.get("APP_CACHE_DIR")
+    if base:
+        return Path(base) / "subcommands.json"
+    xdg = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg) / "app" / "subcommands.json"
+
+
+def _binary_key(binary: str) -> Optional[Tuple[str, int, int]]:
+    """Return ``(resolved path, mtime_ns, size)`` or None if not on PATH."""
+    found = shutil.which(binary)
+    if found is None:
+        return None
+    resolved = os.path.realpath(found)
+    st = os.stat(resolved)
+    return resolved, st.st_mtime_ns, st.st_size
+
+
+def _load_cache() -> Dict[str, Dict[str, Any]]:
+    try:
+        data = json.loads(cache_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("binaries", {})
+
+
+def _store_cache(key: Tuple[str, int, int], subcommands: Set[str]) -> None:
+    path, mtime_ns, size = key
+    entries = _load_cache()
+    entries[path] = {
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "subcommands": sorted(subcommands),
+    }
+    target = cache_path()
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "binaries": entries}))
+        tmp.replace(target)
+    except OSError as exc:  # pragma: no cover - read-only home, full disk...
+        logger.debug("Cannot write subcommand cache %s: %s", target, exc)
+
+
+def list_subcommands(binary: str, use_cache: bool = True) -> Set[str]:
+    """Return the set of available subcommands for ``binary``.
+
+    Results are memoized in-process and cached on disk, keyed by the resolved
+    executable path with its mtime and size, so validation usually costs a
+    ``stat`` instead of spawning ``binary --help``. Binaries that are not on
+    ``PATH`` are never cached. Wrappers whose subcommands change without the
+    executable itself changing (e.g. editable installs) need
+    :func:`refresh_cache`.
+    """
+    key = _binary_key(binary) if use_cache else None
+    if key is not None:
+        if key in _MEMO:
+            return set(_MEMO[key])
+        entry = _load_cache().get(key[0])
+        if entry and (entry.get("mtime_ns"), entry.get("size")) == key[1:]:
+            _MEMO[key] = set(entry["subcommands"])
+            return set(_MEMO[key])
+    subcommands = _parse_subcommands(_run_help(binary))
+    if subcommands:
+        key = key or _binary_key(binary)
+        if key is not None:
+            _MEMO[key] = set(subcommands)
+            _store_cache(key, subcommands)
+    return subcommands
+
+
+def refresh_cache(binaries: Sequence[str] | None = None) -> Dict[str, Set[str]]:
+    """Rebuild cache entries for ``binaries`` (default: every cached binary)."""
+    _MEMO.clear()
+    targets: List[str] = list(binaries) if binaries else list(_load_cache())
+    return {binary: list_subcommands(binary, use_cache=False) for binary in targets}
+
+
 def _levenshtein(a: str, b: str) -> int:
     """Compute the Levenshtein distance between two strings."""
     if a == b:
@@ -102,7 +195,11 @@ def _levenshtein(a: str, b: str) -> int:
 
 def ensure_subcommand(binary: str, subcmd: str) -> None:
     """Ensure that ``subcmd`` exists for ``binary`` or raise ``ValueError``."""
-    subcommands = list_subcommands(binary)
+    check_subcommand(binary, subcmd, list_subcommands(binary))
+
+
+def check_subcommand(binary: str, subcmd: str, subcommands: Set[str]) -> None:
+    """Raise ``ValueError`` with suggestions if ``subcmd`` is not known."""
     if subcmd in subcommands:
         return
     suggestions = sorted([c for c in subcommands if _levenshtein(subcmd, c) <= 2])
@@ -116,8 +213,60 @@ def ensure_subcommand(binary: str, subcmd: str) -> None:
     raise ValueError(msg)
 
 
+def resolve_alias(binary: str, subcmd: str) -> str:
+    """Map a deprecated ``subcmd`` alias of ``binary`` to its canonical name."""
+    return ALIASES.get(binary, {}).get(subcmd, subcmd)
+
+
+def _pump(source: IO[str], sink: Optional[IO[str]], tail: Deque[str]) -> None:
+    """Forward ``source`` line by line to ``sink`` and keep the last lines."""
+    for line in source:
+        tail.append(line)
+        if sink is not None:
+            sink.write(line)
+            sink.flush()
+    source.close()
+
+
+def _run_streaming(
+    cmd: List[str], timeout: Optional[float], tail_lines: int
+) -> CompletedProcess[str]:
+    out_tail: Deque[str] = deque(maxlen=tail_lines)
+    err_tail: Deque[str] = deque(maxlen=tail_lines)
+    proc = subprocess.Popen(
+        cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    assert proc.stdout is not None and proc.stderr is not None
+    pumps = [
+        threading.Thread(target=_pump, args=(proc.stdout, sys.stdout, out_tail)),
+        threading.Thread(target=_pump, args=(proc.stderr, sys.stderr, err_tail)),
+    ]
+    for pump in pumps:
+        pump.daemon = True
+        pump.start()
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        for pump in pumps:
+            pump.join()
+        raise subprocess.TimeoutExpired(
+            cmd, timeout or 0, "".join(out_tail), "".join(err_tail)
+        )
+    for pump in pumps:
+        pump.join()
+    return CompletedProcess(cmd, returncode, "".join(out_tail), "".join(err_tail))
+
+
 def run_cli(
-    binary: str, args: Sequence[str] | None = None, *, dry_run: bool = False
+    binary: str,
+    args: Sequence[str] | None = None,
+    *,
+    dry_run: bool = False,
+    timeout: Optional[float] = 5,
+    stream: bool = False,
+    tail_lines: int = 200,
 ) -> CompletedProcess[str]:
     """Run ``binary`` with ``args`` after validating the subcommand.
 
@@ -129,13 +278,21 @@ def run_cli(
         Command arguments; the first element is treated as subcommand.
     dry_run: bool
         If True, the command is only logged and not executed.
+    timeout: float, optional
+        Seconds before the command is killed; None disables the timeout.
+    stream: bool
+        If True, forward the child's stdout/stderr line by line as it arrives
+        instead of buffering it. Only the last ``tail_lines`` lines of each
+        stream are kept for the returned process and error messages, so memory
+        stays constant for long-running, chatty commands.
+    tail_lines: int
+        Number of lines retained per stream in streaming mode.
     """
     if args is None:
         args = []
     args = list(args)
     if args:
-        subcmd = args[0]
-        subcmd = ALIASES.get(binary, {}).get(subcmd, subcmd)
+        subcmd = resolve_alias(binary, args[0])
         ensure_subcommand(binary, subcmd)
         args[0] = subcmd
     cmd = [binary] + args
@@ -143,13 +300,22 @@ def run_cli(
     if dry_run:
         print(" ".join(cmd))
         return CompletedProcess(cmd, 0, "", "")
+    if stream:
+        cp = _run_streaming(cmd, timeout, tail_lines)
+        if cp.returncode:
+            raise RuntimeError(
+                f"Command {' '.join(cmd)} failed with code {cp.returncode}\n"
+                f"stdout (last {tail_lines} lines): {cp.stdout}\n"
+                f"stderr (last {tail_lines} lines): {cp.stderr}"
+            )
+        return cp
     try:
         cp = subprocess.run(
             cmd,
             text=True,
             capture_output=True,
             check=True,
-            timeout=5,
+            timeout=timeout,
         )
     except subprocess.CalledProcessError as exc:
         msg = (
@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 import argparse
+import json
+import sys
+from pathlib import Path
 from typing import Sequence
 
 from .cli_safe import run_cli
@@ -11,7 +14,46 @@ from .cli_safe import run_cli
 def main(argv: Sequence[str] | None = None) -> None:
     parser = argparse.ArgumentParser(description="Run a CLI with validation")
     parser.add_argument("--dry-run", action="store_true", help="Only validate")
-    parser.add_argument("binary", help="Executable to run")
+    parser.add_argument(
+        "--batch", type=Path, metavar="MANIFEST", help="Run commands from a manifest"
+    )
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent commands")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Timeout in seconds, 0 disables it (default: 5, none in batch mode)",
+    )
+    parser.add_argument(
+        "--stream", action="store_true", help="Forward output as it arrives"
+    )
+    parser.add_argument("--retries", type=int, default=0, help="Retries (batch)")
+    parser.add_argument("--output", type=Path, help="Write the batch report here")
+    parser.add_argument("binary", nargs="?", help="Executable to run")
     parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments")
     ns = parser.parse_args(argv)
-    run_cli(ns.binary, ns.args, dry_run=ns.dry_run)
+    if ns.batch is None:
+        if ns.binary is None:
+            parser.error("binary is required without --batch")
+        timeout = 5 if ns.timeout is None else ns.timeout or None
+        run_cli(
+            ns.binary, ns.args, dry_run=ns.dry_run, timeout=timeout, stream=ns.stream
+        )
+        return
+
+    from .batch import load_manifest, run_batch
+
+    report = run_batch(
+        load_manifest(ns.batch),
+        jobs=ns.jobs,
+        timeout=ns.timeout or None,
+        retries=ns.retries,
+        dry_run=ns.dry_run,
+    )
+    data = report.to_dict()
+    text = json.dumps(data, indent=2)
+    if ns.output:
+        ns.output.write_text(text)
+    else:
+        print(text)
+    if data["failed"]:
+        sys.exit(1)
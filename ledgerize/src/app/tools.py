@@ -5,7 +5,7 @@ from __future__ import annotations
 import argparse
 from typing import Sequence
 
-from .cli_safe import list_subcommands
+from .cli_safe import list_subcommands, refresh_cache
 
 
 def main(argv: Sequence[str] | None = None) -> None:
@@ -13,7 +13,12 @@ def main(argv: Sequence[str] | None = None) -> None:
     sub = parser.add_subparsers(dest="cmd", required=True)
     ps = sub.add_parser("print-subcommands", help="List subcommands of a binary")
     ps.add_argument("binary")
+    rc = sub.add_parser("refresh-cache", help="Rebuild the cached subcommand lists")
+    rc.add_argument("binaries", nargs="*", help="Default: every cached binary")
     ns = parser.parse_args(argv)
     if ns.cmd == "print-subcommands":
         for name in sorted(list_subcommands(ns.binary)):
             print(name)
+    elif ns.cmd == "refresh-cache":
+        for binary, names in refresh_cache(ns.binaries).items():
+            print(f"{binary}: {len(names)} subcommands")
@@ -1,6 +1,16 @@
 """Ledgerize package."""
 
-from . import vault
+from __future__ import annotations
+
+import importlib
+from typing import Any
 
 __all__ = ["__version__", "vault"]
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use: cryptography and keyring slow down CLI startup.
+    if name == "vault":
+        return importlib.import_module(f"{__name__}.vault")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Dict, List, Optional, Sequence, Type
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Decisions are logged here; the logger only has a handler while an
+# AuditLog is open, and never propagates to the console handler.
+audit_logger = logging.getLogger("ledgerize.audit.events")
+audit_logger.propagate = False
+audit_logger.setLevel(logging.INFO)
+
+_active: Optional["AuditLog"] = None
+
+
+def enabled() -> bool:
+    """Return True while an :class:`AuditLog` is recording."""
+    return _active is not None
+
+
+def emit(event: str, rows: List[Dict[str, Any]]) -> None:
+    """Record one ``event`` line per item of ``rows``.
+
+    The rows travel as a single log record, so a whole batch costs one queue
+    put on the calling thread.
+    """
+    if _active is not None and rows:
+        audit_logger.info(event, extra={"audit_rows": rows})
+
+
+def emit_frame(event: str, df: pd.DataFrame, columns: Sequence[str]) -> None:
+    """Record ``event`` for every row of ``df``, keeping the ``columns`` present."""
+    if _active is None or df.empty:
+        return
+    cols = [c for c in columns if c in df]
+    part = df[cols].astype(object)
+    emit(event, part.where(part.notna(), None).to_dict("records"))
+
+
+class JsonlHandler(logging.Handler):
+    """Append audit records to a JSONL file in batches.
+
+    Lines are buffered and written once ``batch_size`` lines are pending, and
+    by a timer thread every ``flush_interval`` seconds between :meth:`start`
+    and :meth:`close`. Every ``summary_interval`` seconds, and on close, the
+    event counts so far are logged once to the ``ledgerize`` logger instead
+    of echoing each decision.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        summary_interval: float = 5.0,
+    ) -> None:
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.summary_interval = summary_interval
+        self.counts: Counter[str] = Counter()
+        self._buffer: List[str] = []
+        self._file: Optional[IO[str]] = None
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+        self._last_summary = time.monotonic()
+
+    def start(self) -> None:
+        """Open the file, creating its directory, and start the flush timer."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a")
+        self._timer = threading.Thread(
+            target=self._tick, name="ledgerize-audit-flush", daemon=True
+        )
+        self._timer.start()
+
+    def _tick(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            with self.lock:  # type: ignore[union-attr]
+                self.flush()
+                if time.monotonic() - self._last_summary >= self.summary_interval:
+                    self._summarize()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            event = record.getMessage()
+            ts = round(record.created, 3)
+            rows = getattr(record, "audit_rows", [{}])
+            self._buffer.extend(
+                json.dumps({"ts": ts, "event": event, **row}, default=str)
+                for row in rows
+            )
+            self.counts[event] += len(rows)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        if self._buffer and self._file is not None:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._file.flush()
+            self._buffer.clear()
+
+    def _summarize(self) -> None:
+        self._last_summary = time.monotonic()
+        if self.counts:
+            counts = ", ".join(f"{n} {e}" for e, n in sorted(self.counts.items()))
+            logger.info("Audit log %s: %s", self.path, counts)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        try:
+            with self.lock:  # type: ignore[union-attr]
+                if self._file is not None:
+                    self.flush()
+                    self._summarize()
+                    self._file.close()
+                    self._file = None
+        finally:
+            super().close()
+
+
+class AuditLog:
+    """Record dedupe, rule and validation decisions to ``path`` while open.
+
+    Callers only pay for building the rows and a queue put; formatting and
+    file writes happen on a :class:`logging.handlers.QueueListener` thread.
+    The file is opened, and its directory created, on entering the context.
+    Only one audit log can be open at a time.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        summary_interval: float = 5.0,
+    ) -> None:
+        self.path = path
+        self.handler = JsonlHandler(
+            path,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            summary_interval=summary_interval,
+        )
+        self._queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._queue_handler = logging.handlers.QueueHandler(self._queue)
+        self._listener = logging.handlers.QueueListener(self._queue, self.handler)
+
+    def __enter__(self) -> "AuditLog":
+        global _active
+        if _active is not None:
+            raise RuntimeError(f"An audit log is already open: {_active.path}")
+        self.handler.start()
+        audit_logger.addHandler(self._queue_handler)
+        self._listener.start()
+        _active = self
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        global _active
+        _active = None
+        audit_logger.removeHandler(self._queue_handler)
+        self._listener.stop()
+        self.handler.close()
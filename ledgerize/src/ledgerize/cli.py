@@ -1,20 +1,22 @@
 from __future__ import annotations
 
+import contextlib
 import json
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 import click
-import pandas as pd
 
-from .config import load_accounts, load_rules
-from .db import Database
 from .guard import ensure_clean_repo
 from .logging import configure_logging
-from .parsers import parse_file, preview_file
-from .report import build_report
-from .rules import apply_rules, explain_transaction
-from . import vault
+
+# pandas, SQLAlchemy, plotly and cryptography are imported inside the
+# commands that need them, so quick commands such as ``explain`` answered by
+# ``ledgerize serve`` do not pay their import cost.
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .db import Store
 
 
 @click.group()
@@ -36,6 +38,73 @@ def main(verbose: bool = False, i_know_what_im_doing: bool = False) -> None:
 @click.option("--merge", is_flag=True, help="Merge with existing database if present")
 @click.option("--secure", is_flag=True, help="Encrypt output into a vault")
 @click.option("--vault-dir", type=click.Path(path_type=Path))
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Store low-cardinality columns as categoricals to reduce memory",
+)
+@click.option(
+    "--validate",
+    is_flag=True,
+    help="Validate rows before ingest and write failures to rejects.csv",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Record per-stage timings and memory in import_log.json",
+)
+@click.option(
+    "--profile-dump",
+    type=click.Path(path_type=Path),
+    help="Also write a cProfile (or sampled stack) dump to this file",
+)
+@click.option(
+    "--profile-mode",
+    type=click.Choice(["cprofile", "sample"]),
+    default="cprofile",
+    show_default=True,
+)
+@click.option(
+    "--fx-rates",
+    type=click.Path(exists=True, path_type=Path),
+    help="Daily FX rates (CSV or Parquet: date, currency, rate) for amount_base",
+)
+@click.option(
+    "--base-currency",
+    help="Currency of amount_base (default: base_currency in --accounts, then --currency)",
+)
+@click.option(
+    "--transfers", is_flag=True, help="Tag transfers between your own accounts"
+)
+@click.option(
+    "--transfer-window",
+    default=3,
+    show_default=True,
+    help="Maximum days between the two sides of a transfer",
+)
+@click.option(
+    "--pipeline",
+    is_flag=True,
+    help="Write each parsed file on a background thread while parsing the next",
+)
+@click.option(
+    "--queue-size",
+    default=4,
+    show_default=True,
+    help="Parsed files waiting for the --pipeline writer before parsing pauses",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["sqlite", "parquet"]),
+    default="sqlite",
+    show_default=True,
+    help="Store transactions in ledgerize.db or a ledgerize.parquet dataset",
+)
+@click.option(
+    "--audit-log",
+    type=click.Path(path_type=Path),
+    help="Append dropped duplicates, rule matches and rejects to this JSONL file",
+)
 def import_(
     input_dir: Path,
     rules: Path,
@@ -46,25 +115,167 @@ def import_(
     merge: bool,
     secure: bool,
     vault_dir: Optional[Path],
+    compact: bool,
+    validate: bool,
+    profile: bool,
+    profile_dump: Optional[Path],
+    profile_mode: str,
+    fx_rates: Optional[Path],
+    base_currency: Optional[str],
+    transfers: bool,
+    transfer_window: int,
+    pipeline: bool,
+    queue_size: int,
+    backend: str,
+    audit_log: Optional[Path],
 ) -> None:
-    """Import CSV files into a SQLite database."""
-    out.mkdir(parents=True, exist_ok=True)
-    rule_cfg = load_rules(rules)
-    acc_cfg = load_accounts(accounts)
-    db = Database(out / "ledgerize.db", merge=merge)
-    txns = []
-    for path in input_dir.rglob("*.csv"):
-        df = parse_file(path, acc_cfg, currency=currency)
-        if since is not None:
-            df = df[df["date"] >= since.date()]
-        df = apply_rules(df, rule_cfg)
-        txns.append(df)
-    if txns:
-        all_df = pd.concat(txns, ignore_index=True)
-        db.ingest_dataframe(all_df)
-        db.export(all_df, out)
+    """Import CSV files into a SQLite database or a Parquet dataset."""
+    import pandas as pd
+
+    from . import audit, vault
+    from .compact import compact_frame, frame_memory, log_memory
+    from .config import load_accounts, load_base_currency, load_rules
+    from .db import open_database, record_rules
+    from .dedupe import Deduper
+    from .parsers import parse_file
+    from .profiling import ImportProfile, capture_profile
+    from .reconcile import reconcile, summarize
+    from .rules import apply_rules
+    from .validate import validate_frame, write_rejects
+
+    fx_base = (base_currency or load_base_currency(accounts) or currency).upper()
+    # Stages are always timed; the cost is a few clock reads per file.
+    profiler = ImportProfile()
+    log: Dict[str, Any] = {}
+    rejected: List[pd.DataFrame] = []
+
+    def convert_fx(df: pd.DataFrame, file: Optional[Path] = None) -> pd.DataFrame:
+        from .fx import convert, load_rates
+
+        assert fx_rates is not None
+        with profiler.stage("fx", file=file, rows_in=len(df)) as st:
+            df = convert(df, load_rates(fx_rates), fx_base)
+            st.rows_out = len(df)
+        unconverted = int(df["amount_base"].isna().sum())
+        log["fx_unconverted"] = log.get("fx_unconverted", 0) + unconverted
+        return df
+
+    def validate_rows(df: pd.DataFrame, file: Optional[Path] = None) -> pd.DataFrame:
+        with profiler.stage("validate", file=file, rows_in=len(df)) as st:
+            df, rejects = validate_frame(df)
+            st.rows_out = len(df)
+        rejected.append(rejects)
+        return df
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(capture_profile(profile_dump, profile_mode))
+        if audit_log is not None:
+            stack.enter_context(audit.AuditLog(audit_log))
+        out.mkdir(parents=True, exist_ok=True)
+        with profiler.stage("load_config"):
+            rule_cfg = load_rules(rules)
+            acc_cfg = load_accounts(accounts)
+        name = "ledgerize.parquet" if backend == "parquet" else "ledgerize.db"
+        fresh = not merge or not (out / name).exists()
+        db = open_database(out / name, backend, merge=merge, compact=compact)
+        if pipeline and transfers:
+            click.echo("--transfers needs every file at once; importing sequentially")
+        writer = None
+        if pipeline and not transfers:
+            from .pipeline import BatchWriter
+
+            writer = BatchWriter(db, out, profiler, maxsize=queue_size)
+        txns = []
+        try:
+            for path in input_dir.rglob("*.csv"):
+                with profiler.stage("parse", file=path) as st:
+                    try:
+                        df = parse_file(
+                            path, acc_cfg, currency=currency, compact=compact
+                        )
+                    except Exception as exc:
+                        audit.emit(
+                            "parse_error", [{"file": str(path), "error": str(exc)}]
+                        )
+                        raise
+                    st.rows_out = len(df)
+                if since is not None:
+                    with profiler.stage(
+                        "filter_since", file=path, rows_in=len(df)
+                    ) as st:
+                        df = df[df["date"] >= since.date()]
+                        st.rows_out = len(df)
+                with profiler.stage("apply_rules", file=path, rows_in=len(df)) as st:
+                    df = apply_rules(df, rule_cfg, hits=profiler.rule_hits)
+                    st.rows_out = len(df)
+                if writer is None:
+                    txns.append(df)
+                    continue
+                if fx_rates is not None:
+                    df = convert_fx(df, path)
+                if validate:
+                    df = validate_rows(df, path)
+                writer.put(path, df)
+        except BaseException:
+            if writer is not None:
+                with contextlib.suppress(Exception):
+                    writer.close()
+            raise
+        if writer is not None:
+            result = writer.close()
+            if not result.rows:
+                return
+            rows = result.rows
+            profiler.dedupe_dropped = result.rows - result.written
+            with profiler.stage("reconcile", rows_in=rows):
+                log["reconcile"] = summarize(
+                    reconcile(pd.concat(result.reconcile, ignore_index=True))
+                )
+        elif txns:
+            with profiler.stage("concat", rows_in=sum(len(t) for t in txns)) as st:
+                all_df = pd.concat(txns, ignore_index=True)
+                if compact:
+                    # Categoricals with differing categories concatenate as objects.
+                    before = frame_memory(all_df)
+                    all_df = compact_frame(all_df)
+                    log_memory("import", before, frame_memory(all_df))
+                st.rows_out = len(all_df)
+            if fx_rates is not None:
+                all_df = convert_fx(all_df)
+            if transfers:
+                from .transfers import detect_transfers
+
+                with profiler.stage("transfers", rows_in=len(all_df)) as st:
+                    all_df = detect_transfers(all_df, window=transfer_window)
+                    st.rows_out = len(all_df)
+                log["transfers"] = int(all_df["transfer_id"].nunique())
+            if validate:
+                all_df = validate_rows(all_df)
+            with profiler.stage("dedupe", rows_in=len(all_df)) as st:
+                unique = Deduper()(all_df)
+                st.rows_out = len(unique)
+            profiler.dedupe_dropped = len(all_df) - len(unique)
+            # Reconcile what is stored: duplicates would read as overlaps.
+            with profiler.stage("reconcile", rows_in=len(unique)):
+                log["reconcile"] = summarize(reconcile(unique))
+            with profiler.stage("ingest_dataframe", rows_in=len(unique)) as st:
+                st.rows_out = db.ingest_dataframe(unique)
+            with profiler.stage("export", rows_in=len(all_df)):
+                db.export(all_df, out)
+            rows = len(all_df)
+        else:
+            return
+        record_rules(db, rule_cfg, fresh)
+        if validate:
+            rejects = pd.concat(rejected, ignore_index=True)
+            log["rejected"] = len(rejects)
+            if len(rejects):
+                write_rejects(rejects, out / "rejects.csv")
+                click.echo(f"{len(rejects)} rows rejected, see {out / 'rejects.csv'}")
+        if profile:
+            log["profile"] = profiler.to_dict()
         log_path = out / "import_log.json"
-        log_path.write_text(json.dumps({"rows": len(all_df)}))
+        log_path.write_text(json.dumps({"rows": rows, **log}))
         if secure:
             vdir = vault_dir or (out.parent / "vault")
             vdir.mkdir(parents=True, exist_ok=True)
@@ -75,43 +286,341 @@ def import_(
                     p.unlink()
 
 
+@main.command()
+@click.argument("input_dir", type=click.Path(exists=True, path_type=Path))
+@click.option("--rules", type=click.Path(exists=True, path_type=Path), required=True)
+@click.option("--accounts", type=click.Path(exists=True, path_type=Path), required=True)
+@click.option("--out", type=click.Path(path_type=Path), required=True)
+@click.option("--currency", default="EUR")
+@click.option(
+    "--interval", default=2.0, show_default=True, help="Seconds between polls"
+)
+@click.option(
+    "--settle",
+    default=2.0,
+    show_default=True,
+    help="Minimum age in seconds of a file before it is ingested",
+)
+@click.option("--compact", is_flag=True, help="Use the compact in-memory layout")
+@click.option("--once", is_flag=True, help="Ingest pending files and exit")
+def watch(
+    input_dir: Path,
+    rules: Path,
+    accounts: Path,
+    out: Path,
+    currency: str,
+    interval: float,
+    settle: float,
+    compact: bool,
+    once: bool,
+) -> None:
+    """Continuously ingest new or modified CSV files from INPUT_DIR."""
+    from .config import load_accounts, load_rules
+    from .db import Database
+    from .watch import IngestResult, Watcher
+
+    out.mkdir(parents=True, exist_ok=True)
+    watcher = Watcher(
+        input_dir,
+        Database(out / "ledgerize.db", compact=compact),
+        load_rules(rules),
+        load_accounts(accounts),
+        currency=currency,
+        settle=settle,
+        compact=compact,
+    )
+
+    def report(result: IngestResult) -> None:
+        click.echo(
+            f"{result.path.name}: {result.written}/{result.rows} rows written "
+            f"in {result.latency_s:.3f}s (lag {result.lag_s:.1f}s)"
+        )
+
+    if once:
+        for result in watcher.poll_once():
+            report(result)
+        return
+    click.echo(f"Watching {input_dir} (Ctrl+C to stop)")
+    try:
+        watcher.run(interval, on_ingest=report)
+    except KeyboardInterrupt:
+        pass
+
+
 @main.command()
 @click.argument("csv_file", type=click.Path(exists=True, path_type=Path))
 @click.option("--rules", type=click.Path(exists=True, path_type=Path), required=True)
 @click.option("--accounts", type=click.Path(exists=True, path_type=Path), required=True)
 @click.option("--n", default=20)
-def preview(csv_file: Path, rules: Path, accounts: Path, n: int) -> None:
+@click.option("--compact", is_flag=True, help="Use the compact in-memory layout")
+def preview(csv_file: Path, rules: Path, accounts: Path, n: int, compact: bool) -> None:
     """Preview the first N normalized rows of a CSV file."""
+    from .config import load_accounts, load_rules
+    from .parsers import preview_file
+    from .rules import apply_rules
+
     rule_cfg = load_rules(rules)
     acc_cfg = load_accounts(accounts)
-    df = preview_file(csv_file, acc_cfg, n)
+    df = preview_file(csv_file, acc_cfg, n, compact=compact)
     df = apply_rules(df, rule_cfg)
     click.echo(df.head(n).to_string())
 
 
+def _open_store(
+    db: Optional[Path], vault_file: Optional[Path], compact: bool = False
+) -> Store:
+    """Open ``--db``, or the database inside ``--vault`` in memory."""
+    if (db is None) == (vault_file is None):
+        raise click.UsageError("Pass exactly one of --db and --vault")
+    if vault_file is not None:
+        from .vault import load_database
+
+        return load_database(vault_file, compact=compact)
+    from .db import open_database
+
+    assert db is not None
+    return open_database(db, compact=compact)
+
+
+vault_option = click.option(
+    "--vault",
+    "--from-vault",
+    "vault_file",
+    type=click.Path(exists=True, path_type=Path),
+    help="Decrypt the database of this .lzvault in memory instead of --db",
+)
+
+
 @main.command()
-@click.option("--db", type=click.Path(exists=True, path_type=Path), required=True)
+@click.option("--db", type=click.Path(exists=True, path_type=Path))
+@vault_option
 @click.option("--html", type=click.Path(path_type=Path), required=True)
-@click.option("--months", default=12)
-def report(db: Path, html: Path, months: int) -> None:
+@click.option(
+    "--months",
+    type=int,
+    help="Cover the latest N months [default: 12, every month with --light]",
+)
+@click.option("--compact", is_flag=True, help="Use the compact in-memory layout")
+@click.option(
+    "--light",
+    is_flag=True,
+    help="Embed only aggregated totals; per-month detail goes to gzipped shards",
+)
+@click.option(
+    "--budget",
+    default=256,
+    show_default=True,
+    help="Maximum size of the --light page in KB",
+)
+@click.option(
+    "--base-currency",
+    help="Currency of amount_base (default: base_currency in --accounts)",
+)
+@click.option(
+    "--accounts",
+    type=click.Path(exists=True, path_type=Path),
+    help="Accounts file whose base_currency the FX totals are in",
+)
+def report(
+    db: Optional[Path],
+    vault_file: Optional[Path],
+    html: Path,
+    months: Optional[int],
+    compact: bool,
+    light: bool,
+    budget: int,
+    base_currency: Optional[str],
+    accounts: Optional[Path],
+) -> None:
     """Generate an offline HTML report."""
-    database = Database(db)
-    df = database.read_transactions(months)
-    build_report(df, html)
+    from .config import load_base_currency
+
+    base = base_currency or (load_base_currency(accounts) if accounts else None)
+    database = _open_store(db, vault_file, compact=compact)
+    if light:
+        from .report import build_light_report
+
+        size = build_light_report(
+            database.read_all(), html, budget=budget * 1000, months=months, base=base
+        )
+        click.echo(f"Wrote {html} ({size / 1000:.1f} KB)")
+        return
+    from .report import build_report
+
+    df = database.read_transactions(12 if months is None else months)
+    build_report(df, html, base=base)
 
 
 @main.command()
-@click.option("--db", type=click.Path(exists=True, path_type=Path), required=True)
+@click.option("--db", type=click.Path(exists=True, path_type=Path))
+@vault_option
 @click.argument("query")
-def explain(db: Path, query: str) -> None:
+def explain(db: Optional[Path], vault_file: Optional[Path], query: str) -> None:
     """Explain the rule applied to the transaction matching query."""
-    database = Database(db)
-    tx = database.find_transaction(query)
-    if tx is None:
+    from .client import query_server
+
+    found, payload = False, None
+    if db is not None and vault_file is None:
+        found, payload = query_server(db, "/explain", {"q": query})
+    if not found:
+        from .rules import explain_transaction
+
+        tx = _open_store(db, vault_file).find_transaction(query)
+        if tx is not None:
+            payload = {"transaction": tx, "rule": explain_transaction(tx)}
+    if payload is None:
         click.echo("Transaction not found")
         return
-    rule = explain_transaction(tx)
-    click.echo(json.dumps({"transaction": tx, "rule": rule}, default=str, indent=2))
+    click.echo(json.dumps(payload, default=str, indent=2))
+
+
+@main.command()
+@click.option("--db", type=click.Path(exists=True, path_type=Path), required=True)
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=0, help="Port to listen on (0 picks a free one)")
+def serve(db: Path, host: str, port: int) -> None:
+    """Serve explain lookups, transactions and monthly totals over HTTP."""
+    from .server import serve_forever
+
+    serve_forever(
+        db, host, port, on_ready=lambda url: click.echo(f"Serving {db} on {url}")
+    )
+
+
+@main.command()
+@click.option("--db", type=click.Path(exists=True, path_type=Path), required=True)
+@click.option("--rules", type=click.Path(exists=True, path_type=Path), required=True)
+@click.option(
+    "--previous",
+    type=click.Path(exists=True, path_type=Path),
+    help="Rules the database was categorized with (default: stored snapshot)",
+)
+@click.option("--batch-size", default=5000, show_default=True)
+@click.option("--full", is_flag=True, help="Re-evaluate every row")
+def recategorize(
+    db: Path, rules: Path, previous: Optional[Path], batch_size: int, full: bool
+) -> None:
+    """Re-apply RULES to the stored transactions, updating changed rows only."""
+    from .config import load_rules
+    from .db import Database
+    from .recategorize import recategorize as run
+
+    if db.is_dir():
+        raise click.UsageError("recategorize only supports SQLite databases")
+    database = Database(db)
+    if full:
+        old_cfg = None
+    elif previous is not None:
+        old_cfg = load_rules(previous)
+    else:
+        old_cfg = database.rules_snapshot()
+    summary = run(database, load_rules(rules), old_cfg, batch_size=batch_size)
+    click.echo(json.dumps(summary, indent=2))
+
+
+@main.command()
+@click.option("--db", type=click.Path(exists=True, path_type=Path), required=True)
+@click.option("--rebuild", is_flag=True, help="Recompute every series")
+@click.option("--json", "as_json", is_flag=True, help="Print series as JSON")
+def recurring(db: Path, rebuild: bool, as_json: bool) -> None:
+    """List subscriptions and standing orders detected in the ledger."""
+    from .db import Database
+
+    if db.is_dir():
+        from .db import open_database
+        from .recurring import detect_recurring
+
+        series = detect_recurring(open_database(db).read_all())
+    else:
+        database = Database(db)
+        if rebuild:
+            database.refresh_recurring()
+        series = database.read_recurring()
+    if as_json:
+        click.echo(series.to_json(orient="records", date_format="iso", indent=2))
+    elif series.empty:
+        click.echo("No recurring payments found")
+    else:
+        click.echo(series.to_string(index=False))
+
+
+@main.command(name="reconcile")
+@click.option("--db", type=click.Path(exists=True, path_type=Path), required=True)
+@click.option("--tolerance", default=0.005, show_default=True)
+@click.option("--json", "as_json", is_flag=True, help="Print issues as JSON")
+def reconcile_cmd(db: Path, tolerance: float, as_json: bool) -> None:
+    """Check balances, statement gaps and overlaps per account."""
+    from .db import open_database
+    from .reconcile import reconcile, summarize
+
+    df = open_database(db).read_all()
+    issues = reconcile(df, tolerance=tolerance)
+    if as_json:
+        payload = {
+            "summary": summarize(issues),
+            "issues": issues.astype(object)
+            .where(issues.notna(), None)
+            .to_dict(orient="records"),
+        }
+        click.echo(json.dumps(payload, default=str, indent=2))
+    elif issues.empty:
+        click.echo("No issues found")
+    else:
+        click.echo(issues.to_string(index=False))
+    if not issues.empty:
+        raise SystemExit(1)
+
+
+@main.group()
+def rules() -> None:
+    """Rule maintenance commands."""
+
+
+@rules.command(name="stats")
+@click.argument("inputs", nargs=-1, type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--rules", "rules_path", type=click.Path(exists=True, path_type=Path), required=True
+)
+@click.option("--db", type=click.Path(exists=True, path_type=Path))
+@click.option("--accounts", type=click.Path(exists=True, path_type=Path))
+@click.option("--currency", default="EUR")
+@click.option("--json", "as_json", is_flag=True, help="Print statistics as JSON")
+def rules_stats(
+    inputs: Any,
+    rules_path: Path,
+    db: Optional[Path],
+    accounts: Optional[Path],
+    currency: str,
+    as_json: bool,
+) -> None:
+    """Report per-rule time, matches and dead/shadowed rules over a DB or CSVs."""
+    import pandas as pd
+
+    from .config import load_accounts, load_rules
+    from .rule_stats import format_stats, rule_stats, stats_to_dict
+
+    if bool(db) == bool(inputs):
+        raise click.UsageError("Pass either --db or CSV files/directories")
+    if db:
+        from .db import open_database
+
+        df = open_database(db).read_all()
+    else:
+        from .parsers import parse_file
+
+        if accounts is None:
+            raise click.UsageError("--accounts is required with CSV inputs")
+        acc_cfg = load_accounts(accounts)
+        files = [
+            f for p in inputs for f in (sorted(p.rglob("*.csv")) if p.is_dir() else [p])
+        ]
+        frames = [parse_file(f, acc_cfg, currency=currency) for f in files]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    stats = rule_stats(df, load_rules(rules_path))
+    if as_json:
+        click.echo(json.dumps(stats_to_dict(stats, len(df)), indent=2))
+    else:
+        click.echo(format_stats(stats))
 
 
 @main.group()
@@ -121,6 +630,8 @@ def vault_cmd() -> None:
 
 @vault_cmd.command(name="init")
 def vault_init() -> None:
+    from . import vault
+
     vault.init_vault()
     click.echo("vault initialized")
 
@@ -130,6 +641,8 @@ def vault_init() -> None:
 @click.argument("vault_file", type=click.Path(path_type=Path))
 def vault_lock(data_dir: Path, vault_file: Path) -> None:
     """Encrypt a data directory into a vault file."""
+    from . import vault
+
     vault.lock(data_dir, vault_file)
 
 
@@ -138,4 +651,6 @@ def vault_lock(data_dir: Path, vault_file: Path) -> None:
 @click.argument("out_dir", type=click.Path(path_type=Path))
 def vault_unlock(vault_file: Path, out_dir: Path) -> None:
     """Decrypt a vault file into OUT_DIR."""
+    from . import vault
+
     vault.unlock(vault_file, out_dir)
@@ -0,0 +1,60 @@
+"""Client for a running ``ledgerize serve`` instance.
+
+This module only uses the standard library so that CLI commands answered by
+the server do not import pandas or SQLAlchemy.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+
+def discovery_file(db: Path) -> Path:
+    """Return the file in which a server for ``db`` advertises its address."""
+    return db.with_name(db.name + ".server.json")
+
+
+def server_url(db: Path) -> Optional[str]:
+    path = discovery_file(db)
+    try:
+        info = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if info.get("db") != str(db.resolve()):
+        return None
+    return info.get("url")
+
+
+def query_server(
+    db: Path, endpoint: str, params: Dict[str, Any], timeout: float = 5.0
+) -> Tuple[bool, Any]:
+    """Ask the server for ``db`` about ``endpoint``.
+
+    Returns ``(False, None)`` when no server is reachable so callers can fall
+    back to querying the database themselves, and ``(True, None)`` when the
+    server answered that nothing matched.
+    """
+    url = server_url(db)
+    if url is None:
+        return False, None
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(
+        parts.hostname or "127.0.0.1", parts.port, timeout=timeout
+    )
+    try:
+        conn.request("GET", f"{endpoint}?{urlencode(params)}")
+        resp = conn.getresponse()
+        body = resp.read()
+    except OSError:
+        return False, None
+    finally:
+        conn.close()
+    if resp.status == 404:
+        return True, None
+    if resp.status != 200:
+        return False, None
+    return True, json.loads(body)
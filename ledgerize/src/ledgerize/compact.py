@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columns with a handful of distinct values per import.
+CATEGORICAL_COLUMNS = ["account", "currency", "category", "rule_id", "raw_source"]
+# High-cardinality text columns.
+STRING_COLUMNS = ["id", "description", "norm_desc"]
+
+try:  # pragma: no cover - depends on the environment
+    import pyarrow  # noqa: F401
+
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:  # pragma: no cover - pyarrow is optional
+    STRING_DTYPE = "string"
+
+
+def is_compact(df: pd.DataFrame) -> bool:
+    return "account" in df and isinstance(df["account"].dtype, pd.CategoricalDtype)
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Store low-cardinality columns as categoricals and text as Arrow strings."""
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    for col in STRING_COLUMNS:
+        if col in df and df[col].dtype == object:
+            df[col] = df[col].astype(STRING_DTYPE)
+    return df
+
+
+def add_category(series: pd.Series, value: object) -> pd.Series:
+    """Return ``series`` with ``value`` allowed as a category if it is categorical."""
+    if (
+        isinstance(series.dtype, pd.CategoricalDtype)
+        and value is not None
+        and value not in series.cat.categories
+    ):
+        return series.cat.add_categories([value])
+    return series
+
+
+def frame_memory(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def format_bytes(size: float) -> str:
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def log_memory(label: str, before: int, after: int) -> None:
+    logger.info("%s memory: %s -> %s", label, format_bytes(before), format_bytes(after))
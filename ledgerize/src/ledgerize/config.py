@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import yaml
 
@@ -17,3 +17,9 @@ def load_rules(path: Path) -> Dict[str, Any]:
 def load_accounts(path: Path) -> List[Dict[str, str]]:
     data = load_yaml(path)
     return data.get("accounts", [])
+
+
+def load_base_currency(path: Path) -> Optional[str]:
+    """Return the ``base_currency`` set at the top of the accounts file, if any."""
+    base = load_yaml(path).get("base_currency")
+    return str(base).upper() if base else None
@@ -1,36 +1,428 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Set, Tuple
 
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import Engine, bindparam, create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
 
-from .dedupe import dedupe
+from .compact import compact_frame
+from .dedupe import Deduper
+
+
+BACKENDS = ["sqlite", "parquet"]
+# Indexes serving ledgerize.query filters and its (date, id) pagination.
+INDEXES = {
+    "ix_transactions_date_id": "date, id",
+    "ix_transactions_account_date_id": "account, date, id",
+    "ix_transactions_category_date_id": "category, date, id",
+}
+
+
+class Store(Protocol):
+    """Interface shared by the SQLite and Parquet storage backends."""
+
+    path: Path
+
+    def ingest_dataframe(
+        self,
+        df: pd.DataFrame,
+        deduper: Optional[Deduper] = None,
+        refresh: bool = True,
+    ) -> int: ...
+
+    def refresh_derived(
+        self,
+        keys: Iterable[Tuple[str, str]],
+        months: Optional[Iterable[Tuple[str, str]]] = None,
+    ) -> None: ...
+
+    def existing_ids(self, ids: Iterable[str]) -> Set[str]: ...
+
+    def export(self, df: pd.DataFrame, out: Path) -> None: ...
+
+    def read_transactions(self, months: int) -> pd.DataFrame: ...
+
+    def read_all(self) -> pd.DataFrame: ...
+
+    def query_transactions(
+        self,
+        account: Optional[str] = None,
+        category: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]: ...
+
+    def monthly_totals(self, months: int = 12) -> List[Dict[str, Any]]: ...
+
+    def find_transaction(self, query_str: str) -> Optional[Dict[str, Any]]: ...
+
+    def save_rules(self, cfg: Optional[Dict[str, Any]]) -> None: ...
+
+    def rules_snapshot(self) -> Optional[Dict[str, Any]]: ...
+
+
+def open_database(
+    path: Path,
+    backend: Optional[str] = None,
+    merge: bool = True,
+    compact: bool = False,
+) -> Store:
+    """Open ``path`` with ``backend``; a directory defaults to Parquet."""
+    if backend is None:
+        backend = "parquet" if path.is_dir() else "sqlite"
+    if backend == "parquet":
+        try:
+            from .parquet_db import ParquetDatabase
+        except ImportError as exc:  # pragma: no cover - pyarrow is optional
+            raise RuntimeError(
+                "The parquet backend requires pyarrow (install the 'arrow' extra)"
+            ) from exc
+
+        return ParquetDatabase(path, merge=merge, compact=compact)
+    return Database(path, merge=merge, compact=compact)
+
+
+def record_rules(db: Store, cfg: Dict[str, Any], fresh: bool) -> None:
+    """Update the rules snapshot after rows categorized with ``cfg`` were added.
+
+    The snapshot is kept only if every stored row was categorized with
+    ``cfg``: ``fresh`` (the table held no earlier rows) or an unchanged
+    snapshot. Otherwise it is marked stale, so ``recategorize`` falls back to
+    a full pass instead of diffing against rules that older rows never saw.
+    """
+    same = db.rules_snapshot() == json.loads(json.dumps(cfg, default=str))
+    db.save_rules(cfg if fresh or same else None)
+
+
+def touched_months(df: pd.DataFrame) -> Set[Tuple[str, str]]:
+    """Return the ``(account, "YYYY-MM")`` pairs of the rows of ``df``."""
+    months = pd.to_datetime(df["date"]).dt.strftime("%Y-%m")
+    valid = months.notna().to_numpy()
+    return set(zip(df["account"].astype(str)[valid], months[valid]))
+
+
+def export_frame(df: pd.DataFrame, out: Path) -> None:
+    """Write the normalized Parquet, CSV and JSONL exports of ``df``."""
+    try:
+        df.to_parquet(out / "normalized.parquet", index=False)
+    except Exception:
+        pass
+    df.to_csv(out / "normalized.csv", index=False)
+    df.to_json(out / "normalized.jsonl", orient="records", lines=True)
 
 
 class Database:
-    def __init__(self, path: Path, merge: bool = True) -> None:
+    def __init__(
+        self,
+        path: Path,
+        merge: bool = True,
+        compact: bool = False,
+        engine: Optional[Engine] = None,
+    ) -> None:
         self.path = path
-        self.engine = create_engine(f"sqlite:///{path}")
-        if not merge and path.exists():
+        self.compact = compact
+        self.engine = engine or create_engine(f"sqlite:///{path}")
+        if engine is None and not merge and path.exists():
             path.unlink()
 
-    def ingest_dataframe(self, df: pd.DataFrame) -> None:
-        df = dedupe(df)
+    @classmethod
+    def from_bytes(cls, image: bytes, path: Path, compact: bool = False) -> Database:
+        """Open an in-memory copy of the SQLite database ``image``.
+
+        ``path`` only names the database (e.g. the vault it came from); changes
+        such as refreshed aggregates stay in memory.
+        """
+        engine = create_engine(
+            "sqlite://",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+        with engine.connect() as conn:
+            sqlite_conn = conn.connection.driver_connection
+            assert sqlite_conn is not None
+            sqlite_conn.deserialize(image)
+        return cls(path, compact=compact, engine=engine)
+
+    def ingest_dataframe(
+        self,
+        df: pd.DataFrame,
+        deduper: Optional[Deduper] = None,
+        refresh: bool = True,
+    ) -> int:
+        """Deduplicate and append ``df``; return the number of rows written.
+
+        Pass the same ``deduper`` to deduplicate across batches, and
+        ``refresh=False`` to defer :meth:`refresh_derived` to the last batch.
+        """
+        df = (deduper or Deduper())(df)
+        self._add_missing_columns(df)
         df.to_sql("transactions", self.engine, if_exists="append", index=False)
+        self.ensure_indexes()
+        if refresh:
+            self.refresh_derived(
+                zip(df["account"], df["norm_desc"]), touched_months(df)
+            )
+        return len(df)
+
+    def refresh_derived(
+        self,
+        keys: Iterable[Tuple[str, str]],
+        months: Optional[Iterable[Tuple[str, str]]] = None,
+    ) -> None:
+        """Refresh the aggregates of ``months`` and the recurring ``keys`` touched.
+
+        ``months`` holds ``(account, "YYYY-MM")`` pairs; None rebuilds every
+        monthly total.
+        """
+        self.refresh_aggregates(months)
+        keys = set(keys)
+        if not keys:
+            return
+        if inspect(self.engine).has_table("recurring"):
+            self.refresh_recurring(keys)
+        else:
+            # First ingest, or a ledger from before the table existed.
+            self.refresh_recurring()
+
+    def _add_missing_columns(self, df: pd.DataFrame) -> None:
+        """Add columns of ``df`` unknown to an existing ``transactions`` table."""
+        insp = inspect(self.engine)
+        if not insp.has_table("transactions"):
+            return
+        known = {c["name"] for c in insp.get_columns("transactions")}
+        with self.engine.begin() as conn:
+            for col in df.columns:
+                if col not in known:
+                    kind = "REAL" if pd.api.types.is_float_dtype(df[col]) else "TEXT"
+                    conn.execute(
+                        text(f'ALTER TABLE transactions ADD COLUMN "{col}" {kind}')
+                    )
+
+    def ensure_indexes(self) -> None:
+        """Create the :data:`INDEXES` on ``transactions`` if they are missing."""
+        if not inspect(self.engine).has_table("transactions"):
+            return
+        with self.engine.begin() as conn:
+            for name, columns in INDEXES.items():
+                conn.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {name} ON transactions ({columns})"
+                    )
+                )
+
+    def refresh_aggregates(
+        self, months: Optional[Iterable[Tuple[str, str]]] = None
+    ) -> None:
+        """Update the derived ``monthly_totals`` table from ``transactions``.
+
+        With ``months`` (``(account, "YYYY-MM")`` pairs) only those groups are
+        recomputed, each from an indexed date range; otherwise, or when the
+        table is missing or lacks a new column, it is rebuilt.
+        """
+        insp = inspect(self.engine)
+        if not insp.has_table("transactions"):
+            return
+        columns = {c["name"] for c in insp.get_columns("transactions")}
+        has_base = "amount_base" in columns
+        base = ", SUM(amount_base) AS amount_base" if has_base else ""
+        select = (
+            "SELECT substr(date, 1, 7) AS month, account, currency, category, "
+            f"SUM(amount) AS amount{base}, COUNT(*) AS count FROM transactions"
+        )
+        # Both sides of an internal transfer would inflate expenses and income.
+        where = "transfer_id IS NULL" if "transfer_id" in columns else "1"
+        group = "GROUP BY month, account, currency, category"
+        stored = (
+            {c["name"] for c in insp.get_columns("monthly_totals")}
+            if insp.has_table("monthly_totals")
+            else None
+        )
+        if months is None or stored is None or has_base != ("amount_base" in stored):
+            with self.engine.begin() as conn:
+                conn.execute(text("DROP TABLE IF EXISTS monthly_totals"))
+                conn.execute(
+                    text(
+                        f"CREATE TABLE monthly_totals AS {select} WHERE {where} {group}"
+                    )
+                )
+            return
+        params = []
+        for account, month in sorted(set(months)):
+            year, mon = int(month[:4]), int(month[5:7])
+            end = f"{year + mon // 12:04d}-{mon % 12 + 1:02d}-01"
+            params.append(
+                {"a": account, "m": month, "start": f"{month}-01", "end": end}
+            )
+        if not params:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM monthly_totals WHERE account = :a AND month = :m"),
+                params,
+            )
+            insert = text(
+                f"INSERT INTO monthly_totals {select} WHERE {where} AND account = :a "
+                f"AND date >= :start AND date < :end {group}"
+            )
+            for p in params:
+                conn.execute(insert, p)
+
+    def refresh_recurring(
+        self, keys: Optional[Iterable[Tuple[str, str]]] = None, chunk: int = 500
+    ) -> int:
+        """Recompute the ``recurring`` table; return the number of series found.
+
+        With ``keys`` (``(account, norm_desc)`` pairs touched by new rows) only
+        those series are re-read and replaced; otherwise the table is rebuilt.
+        """
+        from .recurring import detect_recurring
+
+        if not inspect(self.engine).has_table("transactions"):
+            return 0
+        columns = "account, norm_desc, currency, date, amount"
+        if keys is None:
+            df = pd.read_sql_query(f"SELECT {columns} FROM transactions", self.engine)
+            found = detect_recurring(df)
+            found.to_sql("recurring", self.engine, if_exists="replace", index=False)
+            return len(found)
+        pairs = {(str(a), str(d)) for a, d in keys}
+        descs = sorted({d for _, d in pairs})
+        stmt = text(
+            f"SELECT {columns} FROM transactions WHERE norm_desc IN :descs"
+        ).bindparams(bindparam("descs", expanding=True))
+        with self.engine.connect() as conn:
+            frames = [
+                pd.read_sql_query(stmt, conn, params={"descs": descs[i : i + chunk]})
+                for i in range(0, len(descs), chunk)
+            ]
+        df = pd.concat(frames, ignore_index=True)
+        touched = pd.Series(list(zip(df["account"], df["norm_desc"]))).isin(pairs)
+        found = detect_recurring(df[touched.to_numpy()])
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM recurring WHERE account = :a AND norm_desc = :d"),
+                [{"a": a, "d": d} for a, d in pairs],
+            )
+            found.to_sql("recurring", conn, if_exists="append", index=False)
+        return len(found)
+
+    def read_recurring(self) -> pd.DataFrame:
+        """Return the stored recurring series, building the table if needed."""
+        if not inspect(self.engine).has_table("recurring"):
+            self.refresh_recurring()
+        return pd.read_sql_query(
+            "SELECT * FROM recurring ORDER BY account, norm_desc", self.engine
+        )
+
+    def save_rules(self, cfg: Optional[Dict[str, Any]]) -> None:
+        """Store ``cfg`` as the rules the ``transactions`` table reflects.
+
+        ``None`` marks the snapshot as stale (see :func:`record_rules`).
+        """
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS rules_snapshot "
+                    "(id INTEGER PRIMARY KEY CHECK (id = 1), rules TEXT)"
+                )
+            )
+            conn.execute(
+                text("INSERT OR REPLACE INTO rules_snapshot VALUES (1, :rules)"),
+                {"rules": None if cfg is None else json.dumps(cfg, default=str)},
+            )
+
+    def rules_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Return the rules stored by :meth:`save_rules`, if any."""
+        if not inspect(self.engine).has_table("rules_snapshot"):
+            return None
+        with self.engine.connect() as conn:
+            row = conn.execute(text("SELECT rules FROM rules_snapshot")).first()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def existing_ids(self, ids: Iterable[str], chunk: int = 500) -> Set[str]:
+        """Return the subset of ``ids`` already stored in the database."""
+        if not inspect(self.engine).has_table("transactions"):
+            return set()
+        ids = list(ids)
+        stmt = text("SELECT id FROM transactions WHERE id IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        )
+        found: Set[str] = set()
+        with self.engine.connect() as conn:
+            for start in range(0, len(ids), chunk):
+                rows = conn.execute(stmt, {"ids": ids[start : start + chunk]})
+                found.update(row[0] for row in rows)
+        return found
 
     def export(self, df: pd.DataFrame, out: Path) -> None:
-        try:
-            df.to_parquet(out / "normalized.parquet", index=False)
-        except Exception:
-            pass
-        df.to_csv(out / "normalized.csv", index=False)
-        df.to_json(out / "normalized.jsonl", orient="records", lines=True)
+        export_frame(df, out)
 
     def read_transactions(self, months: int) -> pd.DataFrame:
-        query = "SELECT * FROM transactions ORDER BY date DESC LIMIT 5000"
-        return pd.read_sql_query(query, self.engine, parse_dates=["date"])
+        """Return the newest rows (at most 5000) of the last ``months`` stored months."""
+        with self.engine.connect() as conn:
+            first = conn.execute(
+                text(
+                    "SELECT DISTINCT substr(date, 1, 7) AS month FROM transactions "
+                    "ORDER BY month DESC LIMIT 1 OFFSET :skip"
+                ),
+                {"skip": max(months, 1) - 1},
+            ).scalar()
+            # Fewer stored months than requested: every row qualifies.
+            where = "" if first is None else "WHERE date >= :start"
+            df = pd.read_sql_query(
+                text(
+                    f"SELECT * FROM transactions {where} ORDER BY date DESC LIMIT 5000"
+                ),
+                conn,
+                params={"start": f"{first}-01"},
+                parse_dates=["date"],
+            )
+        return compact_frame(df) if self.compact else df
+
+    def read_all(self) -> pd.DataFrame:
+        """Return every stored transaction."""
+        return pd.read_sql_query("SELECT * FROM transactions", self.engine)
+
+    def query_transactions(
+        self,
+        account: Optional[str] = None,
+        category: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        clauses: List[str] = []
+        params: Dict[str, Any] = {"limit": limit}
+        for column, op, value in [
+            ("account", "=", account),
+            ("category", "=", category),
+            ("date", ">=", since),
+            ("date", "<=", until),
+        ]:
+            if value is not None:
+                name = f"p{len(clauses)}"
+                clauses.append(f"{column} {op} :{name}")
+                params[name] = value
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        query = f"SELECT * FROM transactions {where}ORDER BY date DESC LIMIT :limit"
+        with self.engine.connect() as conn:
+            return [dict(r) for r in conn.execute(text(query), params).mappings()]
+
+    def monthly_totals(self, months: int = 12) -> List[Dict[str, Any]]:
+        """Return per-month totals by account, currency and category."""
+        if not inspect(self.engine).has_table("monthly_totals"):
+            self.refresh_aggregates()
+        query = text(
+            "SELECT * FROM monthly_totals WHERE month IN "
+            "(SELECT DISTINCT month FROM monthly_totals ORDER BY month DESC "
+            "LIMIT :months) ORDER BY month, account, category"
+        )
+        with self.engine.connect() as conn:
+            return [dict(r) for r in conn.execute(query, {"months": months}).mappings()]
 
     def find_transaction(self, query_str: str) -> Optional[Dict[str, Any]]:
         with self.engine.connect() as conn:
@@ -1,25 +1,75 @@
 from __future__ import annotations
 
 import logging
-from typing import Dict, Tuple
+from typing import Any, Dict, List, Set, Tuple
 
 import pandas as pd
 
+from . import audit
 from .utils import levenshtein
 
 logger = logging.getLogger(__name__)
 
 
+class Deduper:
+    """Drop duplicate and near-duplicate rows across successive frames.
+
+    The ids and ``(account, date, amount)`` keys seen so far are remembered,
+    so feeding a ledger batch by batch keeps the same rows as one call on the
+    whole frame. Dropped rows are recorded as ``duplicate`` events while an
+    audit log is open.
+    """
+
+    def __init__(self) -> None:
+        self.ids: Set[str] = set()
+        self.seen: Dict[Tuple[str, str, float], str] = {}
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        keep = []
+        dropped: List[Dict[str, Any]] = []
+        record = audit.enabled()
+        rows = zip(
+            df["id"],
+            df["account"],
+            df["date"].astype(str),
+            df["amount"].astype(float),
+            df["norm_desc"],
+            df["description"],
+        )
+        for pos, (id_, account, date, amount, norm, desc) in enumerate(rows):
+            if id_ in self.ids:
+                if record:
+                    dropped.append(_dropped(id_, account, date, amount, desc, "id"))
+                continue
+            key = (account, date, amount)
+            if key in self.seen and levenshtein(self.seen[key], norm) <= 2:
+                if record:
+                    dropped.append(
+                        _dropped(id_, account, date, amount, desc, "near_duplicate")
+                    )
+                continue
+            self.ids.add(id_)
+            self.seen[key] = norm
+            keep.append(pos)
+        if len(keep) < len(df):
+            logger.debug("Dropped %d duplicate rows", len(df) - len(keep))
+            audit.emit("duplicate", dropped)
+        # Select by position so column dtypes (categoricals, Arrow strings) survive.
+        return df.iloc[keep]
+
+
+def _dropped(
+    id_: str, account: str, date: str, amount: float, desc: str, reason: str
+) -> Dict[str, Any]:
+    return {
+        "id": id_,
+        "account": account,
+        "date": date,
+        "amount": amount,
+        "description": desc,
+        "reason": reason,
+    }
+
+
 def dedupe(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.drop_duplicates(subset=["id"])
-    seen: Dict[Tuple[str, str, float], str] = {}
-    rows = []
-    for _, row in df.iterrows():
-        key = (row["account"], str(row["date"]), float(row["amount"]))
-        norm = row["norm_desc"]
-        if key in seen and levenshtein(seen[key], norm) <= 2:
-            logger.debug("Dropping near duplicate: %s", row["description"])
-            continue
-        seen[key] = norm
-        rows.append(row)
-    return pd.DataFrame(rows)
+    return Deduper()(df)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RATE_COLUMNS = ["date", "currency", "rate"]
+
+
+@lru_cache(maxsize=8)
+def _load(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, columns=RATE_COLUMNS)
+    else:
+        df = pd.read_csv(path, usecols=RATE_COLUMNS)
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
+    df["currency"] = df["currency"].astype(str).str.upper()
+    df["rate"] = df["rate"].astype("float64")
+    return df.dropna().sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def _key(path: Path) -> Tuple[str, int, int]:
+    resolved = os.path.realpath(path)
+    st = os.stat(resolved)
+    return resolved, st.st_mtime_ns, st.st_size
+
+
+def load_rates(path: Path) -> pd.DataFrame:
+    """Load a daily FX rate table from CSV or Parquet.
+
+    The table has ``date`` (``YYYY-MM-DD``), ``currency`` and ``rate`` columns,
+    ``rate`` being the value of one unit of ``currency`` in the base currency.
+    Tables are cached per process, keyed by path, mtime and size, and returned
+    sorted by date; treat the result as read-only.
+    """
+    return _load(*_key(path))
+
+
+def convert(df: pd.DataFrame, rates: pd.DataFrame, base: str) -> pd.DataFrame:
+    """Return ``df`` with ``amount_base``, the amount in ``base`` currency.
+
+    Each row uses the most recent rate of its currency on or before its date:
+    an as-of join done per currency with a binary search over the sorted rate
+    dates, so the cost is one vectorized lookup per currency rather than per
+    row. Currency codes are matched case-insensitively. Rows already in
+    ``base`` keep their amount; rows without an applicable rate get NaN.
+    """
+    df = df.copy()
+    codes, currencies = pd.factorize(df["currency"].astype(str).str.upper())
+    amount = df["amount"].to_numpy(dtype="float64")
+    out = np.full(len(df), np.nan)
+    dates = None
+    by_currency = dict(tuple(rates.groupby("currency", sort=False)))
+    for code, currency in enumerate(currencies):
+        rows = np.flatnonzero(codes == code)
+        if currency == base:
+            out[rows] = amount[rows]
+            continue
+        table = by_currency.get(currency)
+        if table is None:
+            continue
+        if dates is None:
+            dates = pd.to_datetime(df["date"]).to_numpy("datetime64[ns]")
+        idx = np.searchsorted(table["date"].to_numpy(), dates[rows], side="right") - 1
+        found = idx >= 0
+        out[rows[found]] = amount[rows[found]] * table["rate"].to_numpy()[idx[found]]
+    missing = int(np.isnan(out).sum() - np.isnan(amount).sum())
+    if missing:
+        logger.warning("No FX rate to %s for %d rows", base, missing)
+    df["amount_base"] = out
+    return df
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from typing import Optional
+
 import pandas as pd
 
+from .compact import compact_frame, frame_memory, log_memory
 from .utils import normalize_str, sha1_hash
 
 
@@ -16,7 +19,9 @@ REQUIRED_COLUMNS = [
 ]
 
 
-def finalize(df: pd.DataFrame) -> pd.DataFrame:
+def finalize(
+    df: pd.DataFrame, source: Optional[str] = None, compact: bool = False
+) -> pd.DataFrame:
     df = df.copy()
     df["norm_desc"] = df["description"].map(normalize_str)
     df["id"] = df.apply(
@@ -31,4 +36,10 @@ def finalize(df: pd.DataFrame) -> pd.DataFrame:
     )
     if "category" not in df:
         df["category"] = "Uncategorized"
+    if source is not None:
+        df["raw_source"] = source
+    if compact:
+        before = frame_memory(df)
+        df = compact_frame(df)
+        log_memory(source or "frame", before, frame_memory(df))
     return df
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+import shutil
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .compact import compact_frame
+from .db import export_frame
+from .dedupe import Deduper
+
+PARTITIONS = ["account", "year", "month"]
+# Files starting with "_" are ignored by dataset discovery.
+RULES_FILE = "_rules.json"
+
+
+class ParquetDatabase:
+    """Transactions stored as a Hive-partitioned Parquet dataset.
+
+    Rows live under ``account=<name>/year=<yyyy>/month=<m>/``. Every ingest
+    appends new files to the touched partitions and never rewrites existing
+    ones. Reads push column selection and filters down to the dataset, so
+    partitions and row groups that cannot match are skipped. There are no
+    stored aggregates; :meth:`monthly_totals` groups the Parquet columns
+    directly.
+    """
+
+    def __init__(self, path: Path, merge: bool = True, compact: bool = False) -> None:
+        self.path = path
+        self.compact = compact
+        self._schema: Optional[Tuple[Tuple[str, ...], pa.Schema]] = None
+        if not merge and path.exists():
+            shutil.rmtree(path)
+
+    def _dataset(self) -> Optional[ds.Dataset]:
+        if not self.path.is_dir():
+            return None
+        dataset = ds.dataset(self.path, format="parquet", partitioning="hive")
+        if not dataset.files:
+            return None
+        # Discovery takes the schema of the first file; later imports may add
+        # columns (balance, amount_base) or fill columns that were all null.
+        files = tuple(dataset.files)
+        if self._schema is None or self._schema[0] != files:
+            schemas = [dataset.schema]
+            schemas += [f.physical_schema for f in dataset.get_fragments()]
+            unified = pa.unify_schemas(schemas, promote_options="permissive")
+            self._schema = (files, unified)
+        return ds.dataset(
+            self.path, schema=self._schema[1], format="parquet", partitioning="hive"
+        )
+
+    def _read(
+        self,
+        filter: Optional[ds.Expression] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=columns)
+        table = dataset.to_table(columns=columns, filter=filter)
+        if columns is None:
+            table = table.drop_columns(["year", "month"])
+        df = table.to_pandas()
+        if "account" in df:
+            df["account"] = df["account"].astype(object)
+        return compact_frame(df) if self.compact else df
+
+    def ingest_dataframe(
+        self,
+        df: pd.DataFrame,
+        deduper: Optional[Deduper] = None,
+        refresh: bool = True,
+    ) -> int:
+        """Deduplicate ``df`` and append it as new partition files."""
+        df = (deduper or Deduper())(df)
+        if df.empty:
+            return 0
+        dates = pd.to_datetime(df["date"])
+        data = df.assign(
+            date=dates.dt.date,
+            account=df["account"].astype(str),
+            year=dates.dt.year.astype("int32"),
+            month=dates.dt.month.astype("int32"),
+        )
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        # All-null columns (e.g. rule_id when no rule matched) would be typed
+        # null and conflict with later files holding strings.
+        nulls = [f.name for f in table.schema if pa.types.is_null(f.type)]
+        table = table.cast(
+            pa.schema(
+                [
+                    f.with_type(pa.string()) if f.name in nulls else f
+                    for f in table.schema
+                ],
+                metadata=table.schema.metadata,
+            )
+        )
+        ds.write_dataset(
+            table,
+            self.path,
+            format="parquet",
+            partitioning=PARTITIONS,
+            partitioning_flavor="hive",
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        return len(df)
+
+    def refresh_aggregates(
+        self, months: Optional[Iterable[Tuple[str, str]]] = None
+    ) -> None:
+        """Nothing to refresh: aggregates are computed from the columns."""
+
+    def refresh_derived(
+        self,
+        keys: Iterable[Tuple[str, str]],
+        months: Optional[Iterable[Tuple[str, str]]] = None,
+    ) -> None:
+        """Nothing to refresh: aggregates are computed from the columns."""
+
+    def save_rules(self, cfg: Optional[Dict[str, Any]]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / RULES_FILE).write_text(json.dumps(cfg, default=str))
+
+    def rules_snapshot(self) -> Optional[Dict[str, Any]]:
+        path = self.path / RULES_FILE
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def existing_ids(self, ids: Iterable[str]) -> Set[str]:
+        ids = list(ids)
+        if not ids:
+            return set()
+        df = self._read(ds.field("id").isin(ids), columns=["id"])
+        return set(df["id"].astype(str))
+
+    def export(self, df: pd.DataFrame, out: Path) -> None:
+        export_frame(df, out)
+
+    def _recent_months(self, months: int) -> Optional[ds.Expression]:
+        """Return a partition filter for the latest ``months`` stored months.
+
+        Months are taken from the partition directory names, so no data is read.
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return None
+        stored = set()
+        for file in dataset.files:
+            keys = dict(p.split("=", 1) for p in Path(file).parts if "=" in p)
+            stored.add(int(keys["year"]) * 12 + int(keys["month"]) - 1)
+        year, month = divmod(sorted(stored)[-months:][0], 12)
+        return (ds.field("year") > year) | (
+            (ds.field("year") == year) & (ds.field("month") >= month + 1)
+        )
+
+    def read_transactions(self, months: int) -> pd.DataFrame:
+        df = self._read(self._recent_months(months))
+        if df.empty:
+            return df
+        df["date"] = pd.to_datetime(df["date"])
+        return df.sort_values("date", ascending=False).head(5000)
+
+    def read_all(self) -> pd.DataFrame:
+        return self._read()
+
+    def query_transactions(
+        self,
+        account: Optional[str] = None,
+        category: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        conditions = []
+        if account is not None:
+            conditions.append(ds.field("account") == account)
+        if category is not None:
+            conditions.append(ds.field("category") == category)
+        if since is not None:
+            conditions.append(ds.field("date") >= date.fromisoformat(since))
+        if until is not None:
+            conditions.append(ds.field("date") <= date.fromisoformat(until))
+        filter = None
+        for cond in conditions:
+            filter = cond if filter is None else filter & cond
+        df = self._read(filter)
+        if df.empty:
+            return []
+        df = df.sort_values("date", ascending=False).head(limit)
+        return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+    def monthly_totals(self, months: int = 12) -> List[Dict[str, Any]]:
+        """Return per-month totals by account, currency and category."""
+        dataset = self._dataset()
+        filter = self._recent_months(months)
+        if dataset is None or filter is None:
+            return []
+        value_columns = ["amount"]
+        if "amount_base" in dataset.schema.names:
+            value_columns.append("amount_base")
+        if "transfer_id" in dataset.schema.names:
+            # Both sides of an internal transfer would inflate expenses and income.
+            filter = filter & ds.field("transfer_id").is_null()
+        keys = ["year", "month", "account", "currency", "category"]
+        table = dataset.to_table(columns=keys + value_columns, filter=filter)
+        grouped = table.group_by(keys).aggregate(
+            [(c, "sum") for c in value_columns] + [("amount", "count")]
+        )
+        df = grouped.to_pandas().rename(
+            columns={f"{c}_sum": c for c in value_columns} | {"amount_count": "count"}
+        )
+        df.insert(0, "month_key", df["year"] * 100 + df["month"])
+        df["month"] = df["year"].astype(str) + "-" + df["month"].map("{:02d}".format)
+        df = df.sort_values(["month_key", "account", "category"])
+        return df.drop(columns=["month_key", "year"]).to_dict(orient="records")
+
+    def find_transaction(self, query_str: str) -> Optional[Dict[str, Any]]:
+        filter = (ds.field("id") == query_str) | pc.match_substring(
+            ds.field("description"), query_str, ignore_case=True
+        )
+        df = self._read(filter).head(1)
+        if df.empty:
+            return None
+        return df.astype(object).where(df.notna(), None).to_dict(orient="records")[0]
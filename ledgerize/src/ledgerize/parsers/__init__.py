@@ -22,12 +22,13 @@ def choose_parser(path: Path) -> Type[BaseParser]:
     return GenericParser
 
 
-def parse_file(path: Path, accounts, currency: str) -> pd.DataFrame:
-    parser = choose_parser(path)(accounts, currency)
+def parse_file(
+    path: Path, accounts, currency: str, compact: bool = False
+) -> pd.DataFrame:
+    parser = choose_parser(path)(accounts, currency, compact=compact)
     return parser.parse(path)
 
 
-def preview_file(path: Path, accounts, n: int) -> pd.DataFrame:
-    parser = choose_parser(path)(accounts, "EUR")
-    df = parser.parse(path)
-    return df.head(n)
+def preview_file(path: Path, accounts, n: int, compact: bool = False) -> pd.DataFrame:
+    parser = choose_parser(path)(accounts, "EUR", compact=compact)
+    return parser.parse(path, nrows=n)
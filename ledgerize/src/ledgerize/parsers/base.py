@@ -1,17 +1,21 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import pandas as pd
 
 
 class BaseParser:
-    def __init__(self, accounts: List[dict], currency: str) -> None:
+    def __init__(
+        self, accounts: List[dict], currency: str, compact: bool = False
+    ) -> None:
         self.accounts = accounts
         self.currency = currency
+        self.compact = compact
 
-    def parse(self, path: Path) -> pd.DataFrame:
+    def parse(self, path: Path, nrows: Optional[int] = None) -> pd.DataFrame:
+        """Parse ``path``; only the first ``nrows`` data rows are read if given."""
         raise NotImplementedError
 
     def map_account(self, account: str) -> str:
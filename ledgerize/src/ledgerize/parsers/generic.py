@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Optional
 
 import pandas as pd
 
@@ -10,16 +11,16 @@ from .base import BaseParser
 
 
 class GenericParser(BaseParser):
-    def parse(self, path: Path) -> pd.DataFrame:
-        df = pd.read_csv(path)
+    def parse(self, path: Path, nrows: Optional[int] = None) -> pd.DataFrame:
+        df = pd.read_csv(path, nrows=nrows)
         df["date"] = df["date"].map(lambda x: parse_date(str(x)).date())
         df["amount"] = df["amount"].map(lambda x: parse_amount(str(x)))
+        if "balance" in df:
+            df["balance"] = df["balance"].map(lambda x: parse_amount(str(x)))
         if "currency" not in df:
             df["currency"] = self.currency
         if "account" not in df:
             df["account"] = "UNKNOWN"
         df["account"] = df["account"].map(self.map_account)
         df["category"] = None
-        df = finalize(df)
-        df["raw_source"] = path.name
-        return df
+        return finalize(df, source=path.name, compact=self.compact)
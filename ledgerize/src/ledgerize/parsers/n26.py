@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Optional
 
 import pandas as pd
 
@@ -10,18 +11,18 @@ from .base import BaseParser
 
 
 class N26Parser(BaseParser):
-    def parse(self, path: Path) -> pd.DataFrame:
-        df = pd.read_csv(path, sep=";", dtype=str)
+    def parse(self, path: Path, nrows: Optional[int] = None) -> pd.DataFrame:
+        raw = pd.read_csv(path, sep=";", dtype=str, nrows=nrows)
         df = pd.DataFrame(
             {
-                "date": df["Date"].map(lambda x: parse_date(str(x)).date()),
-                "description": df["Payee"],
-                "amount": df["Amount"].map(lambda x: parse_amount(str(x))),
-                "currency": df["Currency"],
-                "account": df["Account"].map(self.map_account),
+                "date": raw["Date"].map(lambda x: parse_date(str(x)).date()),
+                "description": raw["Payee"],
+                "amount": raw["Amount"].map(lambda x: parse_amount(str(x))),
+                "currency": raw["Currency"],
+                "account": raw["Account"].map(self.map_account),
             }
         )
+        if "Balance" in raw:
+            df["balance"] = raw["Balance"].map(lambda x: parse_amount(str(x)))
         df["category"] = None
-        df = finalize(df)
-        df["raw_source"] = path.name
-        return df
+        return finalize(df, source=path.name, compact=self.compact)
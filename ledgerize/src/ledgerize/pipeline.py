@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from .db import Store, touched_months
+from .dedupe import Deduper
+from .profiling import ImportProfile
+from .reconcile import condense
+
+logger = logging.getLogger(__name__)
+
+_DONE = None
+
+
+class StreamingExport:
+    """Append batches to ``normalized.{csv,jsonl,parquet}`` as they arrive.
+
+    The first batch fixes the CSV header and the Parquet schema; later
+    batches are aligned to it, and columns they add only reach the database
+    and the JSONL export.
+    """
+
+    def __init__(self, out: Path) -> None:
+        self.out = out
+        self.columns: Optional[List[str]] = None
+        self._csv: Optional[IO[str]] = None
+        self._jsonl: Optional[IO[str]] = None
+        self._parquet: Any = None
+        self._schema: Any = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.columns is None:
+            self.columns = list(df.columns)
+            self._csv = open(self.out / "normalized.csv", "w", newline="")
+            self._jsonl = open(self.out / "normalized.jsonl", "w")
+            df.to_csv(self._csv, index=False)
+            self._open_parquet(df)
+        else:
+            extra = [c for c in df.columns if c not in self.columns]
+            if extra:
+                logger.warning("Columns %s not in CSV/Parquet exports", extra)
+            df.reindex(columns=self.columns).to_csv(
+                self._csv, index=False, header=False
+            )
+        assert self._jsonl is not None
+        df.to_json(self._jsonl, orient="records", lines=True)
+        self._write_parquet(df)
+
+    def _plain(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return ``df`` aligned to the export columns with plain string columns."""
+        df = df.reindex(columns=self.columns)
+        text = [
+            c
+            for c in df.columns
+            if isinstance(df[c].dtype, pd.CategoricalDtype)
+            or pd.api.types.is_string_dtype(df[c])
+        ]
+        return df.astype({c: object for c in text})
+
+    def _open_parquet(self, df: pd.DataFrame) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = pa.Schema.from_pandas(self._plain(df), preserve_index=False)
+            # Columns that are all null in the first batch may hold text later.
+            schema = pa.schema(
+                [
+                    f.with_type(pa.string()) if pa.types.is_null(f.type) else f
+                    for f in schema
+                ]
+            )
+            self._schema = schema
+            self._parquet = pq.ParquetWriter(self.out / "normalized.parquet", schema)
+        except Exception:
+            self._parquet = None
+
+    def _write_parquet(self, df: pd.DataFrame) -> None:
+        if self._parquet is None:
+            return
+        try:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(
+                self._plain(df), schema=self._schema, preserve_index=False
+            )
+            self._parquet.write_table(table)
+        except Exception:
+            # Parquet export is best effort, as in the sequential import.
+            logger.debug("Parquet export disabled", exc_info=True)
+            self._parquet.close()
+            self._parquet = None
+
+    def close(self) -> None:
+        for handle in (self._csv, self._jsonl, self._parquet):
+            if handle is not None:
+                handle.close()
+
+
+@dataclass
+class WriterResult:
+    rows: int = 0
+    written: int = 0
+    keys: Set[Tuple[str, str]] = field(default_factory=set)
+    months: Set[Tuple[str, str]] = field(default_factory=set)
+    reconcile: List[pd.DataFrame] = field(default_factory=list)
+
+
+class BatchWriter:
+    """Write categorized batches to the database and exports on a thread.
+
+    The writer thread owns the database and the export files. Batches go
+    through a bounded queue: :meth:`put` blocks while ``maxsize`` batches are
+    waiting, so parsing never runs far ahead of writing.
+    """
+
+    def __init__(
+        self,
+        db: Store,
+        out: Path,
+        profiler: Optional[ImportProfile] = None,
+        maxsize: int = 4,
+    ) -> None:
+        self.db = db
+        self.export = StreamingExport(out)
+        self.profiler = profiler or ImportProfile()
+        self.result = WriterResult()
+        self.error: Optional[BaseException] = None
+        self._queue: "queue.Queue[Optional[Tuple[Path, pd.DataFrame]]]" = queue.Queue(
+            maxsize
+        )
+        self._deduper = Deduper()
+        self._thread = threading.Thread(
+            target=self._run, name="ledgerize-writer", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, path: Path, df: pd.DataFrame) -> None:
+        while True:
+            if self.error is not None:
+                raise RuntimeError("Import writer failed") from self.error
+            try:
+                self._queue.put((path, df), timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self) -> WriterResult:
+        """Flush pending batches, refresh derived tables and return totals."""
+        while self._thread.is_alive():
+            try:
+                self._queue.put(_DONE, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        if self.error is not None:
+            raise RuntimeError("Import writer failed") from self.error
+        return self.result
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    break
+                path, df = item
+                self._write(path, df)
+            with self.profiler.stage("refresh"):
+                self.db.refresh_derived(self.result.keys, self.result.months)
+        except BaseException as exc:  # re-raised by put() and close()
+            self.error = exc
+        finally:
+            self.export.close()
+
+    def _write(self, path: Path, df: pd.DataFrame) -> None:
+        result = self.result
+        with self.profiler.stage("dedupe", file=path, rows_in=len(df)) as st:
+            unique = self._deduper(df)
+            st.rows_out = len(unique)
+        with self.profiler.stage(
+            "ingest_dataframe", file=path, rows_in=len(unique)
+        ) as st:
+            st.rows_out = self.db.ingest_dataframe(unique, refresh=False)
+        result.rows += len(df)
+        result.written += st.rows_out
+        result.keys.update(
+            zip(unique["account"].astype(str), unique["norm_desc"].astype(str))
+        )
+        result.months.update(touched_months(unique))
+        # Only the condensed rows are kept for the final reconciliation.
+        result.reconcile.append(condense(unique))
+        with self.profiler.stage("export", file=path, rows_in=len(df)):
+            self.export.write(df)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+def peak_rss() -> Optional[int]:
+    """Return the peak resident set size of the process in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+@dataclass
+class StageStats:
+    name: str
+    file: Optional[str] = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_bytes: Optional[int] = None
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+
+
+@dataclass
+class ImportProfile:
+    """Per-file and per-stage metrics collected during ``ledgerize import``."""
+
+    stages: List[StageStats] = field(default_factory=list)
+    rule_hits: Dict[str, int] = field(default_factory=dict)
+    dedupe_dropped: int = 0
+    started_at: str = field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat()
+    )
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+    _cpu_start: float = field(default_factory=time.process_time, repr=False)
+
+    @contextmanager
+    def stage(
+        self, name: str, file: Optional[Path] = None, rows_in: Optional[int] = None
+    ) -> Iterator[StageStats]:
+        stats = StageStats(name, str(file) if file else None, rows_in=rows_in)
+        # Thread CPU time: with --pipeline, stages run on two threads at once.
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield stats
+        finally:
+            stats.wall_s = time.perf_counter() - wall
+            stats.cpu_s = time.thread_time() - cpu
+            stats.peak_rss_bytes = peak_rss()
+            self.stages.append(stats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        files: Dict[str, List[Dict[str, Any]]] = {}
+        global_stages: List[Dict[str, Any]] = []
+        totals: Dict[str, Dict[str, float]] = {}
+        for stats in self.stages:
+            record = asdict(stats)
+            name = record.pop("name")
+            file = record.pop("file")
+            entry = {"stage": name, **record}
+            if file is None:
+                global_stages.append(entry)
+            else:
+                files.setdefault(file, []).append(entry)
+            total = totals.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0})
+            total["wall_s"] += stats.wall_s
+            total["cpu_s"] += stats.cpu_s
+        return {
+            "started_at": self.started_at,
+            "wall_s": time.perf_counter() - self._start,
+            "cpu_s": time.process_time() - self._cpu_start,
+            "peak_rss_bytes": peak_rss(),
+            "stages": totals,
+            "files": files,
+            "global": global_stages,
+            "dedupe": {"dropped": self.dedupe_dropped},
+            "rules": self.rule_hits,
+        }
+
+
+class SamplingProfiler:
+    """Sample the calling thread's stack at a fixed interval.
+
+    Samples are written in the folded format understood by flamegraph tools
+    (``frame;frame;frame count`` per line).
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: Path) -> None:
+        lines = [f"{stack} {count}" for stack, count in self.samples.most_common()]
+        path.write_text("\n".join(lines) + "\n")
+
+
+@contextmanager
+def capture_profile(path: Optional[Path], mode: str = "cprofile") -> Iterator[None]:
+    """Profile the enclosed block and dump the result to ``path`` if given."""
+    if path is None:
+        yield
+        return
+    if mode == "sample":
+        sampler = SamplingProfiler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            sampler.dump(path)
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
@@ -0,0 +1,228 @@
+"""Filtered, paginated access to the transactions of a SQLite ledger.
+
+Rows are returned in ``(date, id)`` order, one page per indexed query that
+resumes after the last ``(date, id)`` seen (keyset pagination), so memory is
+bounded by the page size and no read transaction stays open between pages::
+
+    from ledgerize.query import Filters, iter_frames
+
+    for frame in iter_frames("data/ledgerize.db", Filters(since="2024-01-01")):
+        ...
+"""
+
+from __future__ import annotations
+
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import pandas as pd
+from sqlalchemy import bindparam, inspect, text
+
+from .db import Database
+
+__all__ = [
+    "Cursor",
+    "Filters",
+    "Page",
+    "fetch_page",
+    "iter_frames",
+    "iter_records",
+]
+
+# ``(date, id)`` of the last row returned; pass it back as ``after``.
+Cursor = Tuple[str, str]
+DateLike = Union[date, str]
+Values = Union[str, Sequence[str]]
+
+
+@dataclass(frozen=True)
+class Filters:
+    """Conditions combined with AND; ``None`` leaves a field unfiltered.
+
+    ``since`` and ``until`` are inclusive dates, ``account`` and ``category``
+    accept one value or several, the amount bounds are inclusive and
+    ``text`` is a case-insensitive substring of the description.
+    """
+
+    since: Optional[DateLike] = None
+    until: Optional[DateLike] = None
+    account: Optional[Values] = None
+    category: Optional[Values] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    text: Optional[str] = None
+
+
+class Page(NamedTuple):
+    rows: List[Dict[str, Any]]
+    # None once the last matching row has been returned.
+    next_cursor: Optional[Cursor]
+
+
+def _iso(value: DateLike) -> str:
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def _values(value: Values) -> List[str]:
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _where(filters: Filters) -> Tuple[List[str], Dict[str, Any]]:
+    clauses: List[str] = []
+    params: Dict[str, Any] = {}
+    if filters.since is not None:
+        clauses.append("date >= :since")
+        params["since"] = _iso(filters.since)
+    if filters.until is not None:
+        # Dates may be stored with a time part; compare with the next day.
+        until = date.fromisoformat(_iso(filters.until)[:10]) + timedelta(days=1)
+        clauses.append("date < :until")
+        params["until"] = until.isoformat()
+    for column in ("account", "category"):
+        value = getattr(filters, column)
+        if value is not None:
+            clauses.append(f"{column} IN :{column}")
+            params[column] = _values(value)
+    if filters.min_amount is not None:
+        clauses.append("amount >= :min_amount")
+        params["min_amount"] = filters.min_amount
+    if filters.max_amount is not None:
+        clauses.append("amount <= :max_amount")
+        params["max_amount"] = filters.max_amount
+    if filters.text is not None:
+        escaped = filters.text.replace("\\", "\\\\").replace("%", "\\%")
+        clauses.append("description LIKE :text ESCAPE '\\'")
+        params["text"] = "%" + escaped.replace("_", "\\_") + "%"
+    return clauses, params
+
+
+def _open(db: Union[Database, Path, str]) -> Database:
+    if isinstance(db, Database):
+        return db
+    path = Path(db)
+    if path.is_dir():
+        raise ValueError(f"{path} is a Parquet dataset; ledgerize.query needs SQLite")
+    if not path.exists():
+        raise FileNotFoundError(path)
+    return Database(path)
+
+
+def _select(db: Database, columns: Optional[Sequence[str]]) -> Tuple[str, List[str]]:
+    known = [c["name"] for c in inspect(db.engine).get_columns("transactions")]
+    if columns is None:
+        return "*", known
+    unknown = [c for c in columns if c not in known]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    # date and id are always returned: they are the pagination key.
+    selected = list(dict.fromkeys(["date", "id", *columns]))
+    return ", ".join(f'"{c}"' for c in selected), selected
+
+
+def _pages(
+    db: Union[Database, Path, str],
+    filters: Optional[Filters],
+    columns: Optional[Sequence[str]],
+    page_size: int,
+    after: Optional[Cursor],
+) -> Iterator[Tuple[List[str], List[Tuple[Any, ...]]]]:
+    if page_size < 1:
+        raise ValueError("page_size must be positive")
+    database = _open(db)
+    if not inspect(database.engine).has_table("transactions"):
+        return
+    select, names = _select(database, columns)
+    clauses, params = _where(filters or Filters())
+    where = " AND ".join(clauses + ["(date, id) > (:after_date, :after_id)"])
+    stmt = text(
+        f"SELECT {select} FROM transactions WHERE {where} "
+        "ORDER BY date, id LIMIT :limit"
+    ).bindparams(
+        *[bindparam(c, expanding=True) for c in ("account", "category") if c in params]
+    )
+    date_pos, id_pos = names.index("date"), names.index("id")
+    # Every stored date sorts after the empty string.
+    last = after or ("", "")
+    while True:
+        with database.engine.connect() as conn:
+            rows = conn.execute(
+                stmt,
+                {
+                    **params,
+                    "after_date": last[0],
+                    "after_id": last[1],
+                    "limit": page_size,
+                },
+            ).all()
+        if not rows:
+            return
+        yield names, [tuple(r) for r in rows]
+        if len(rows) < page_size:
+            return
+        last = (str(rows[-1][date_pos]), str(rows[-1][id_pos]))
+
+
+def iter_frames(
+    db: Union[Database, Path, str],
+    filters: Optional[Filters] = None,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    chunk_size: int = 10_000,
+    after: Optional[Cursor] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield the matching transactions as DataFrames of ``chunk_size`` rows."""
+    for names, rows in _pages(db, filters, columns, chunk_size, after):
+        yield pd.DataFrame.from_records(rows, columns=names)
+
+
+def iter_records(
+    db: Union[Database, Path, str],
+    filters: Optional[Filters] = None,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    chunk_size: int = 10_000,
+    after: Optional[Cursor] = None,
+) -> Iterator[Tuple[Any, ...]]:
+    """Yield the matching transactions one by one as named tuples.
+
+    Rows are fetched ``chunk_size`` at a time; no DataFrame is built.
+    """
+    make: Any = None
+    for names, rows in _pages(db, filters, columns, chunk_size, after):
+        if make is None:
+            # Field names are only known at run time.
+            record: Any = namedtuple("Record", names, rename=True)  # type: ignore[misc]
+            make = record._make
+        for row in rows:
+            yield make(row)
+
+
+def fetch_page(
+    db: Union[Database, Path, str],
+    filters: Optional[Filters] = None,
+    *,
+    limit: int = 100,
+    after: Optional[Cursor] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> Page:
+    """Return at most ``limit`` rows after the cursor ``after``, as dicts."""
+    # One extra row tells whether another page exists.
+    for names, rows in _pages(db, filters, columns, limit + 1, after):
+        more = len(rows) > limit
+        page = [dict(zip(names, r)) for r in rows[:limit]]
+        cursor = (str(page[-1]["date"]), str(page[-1]["id"])) if more else None
+        return Page(page, cursor)
+    return Page([], None)
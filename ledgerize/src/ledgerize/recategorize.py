@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from .db import Database
+from .rules import apply_rules, compile_rules, rule_mask
+
+logger = logging.getLogger(__name__)
+
+
+def _fingerprint(rule: Dict[str, Any]) -> str:
+    return json.dumps(rule, sort_keys=True, default=str)
+
+
+def changed_rules(
+    old_cfg: Dict[str, Any], new_cfg: Dict[str, Any]
+) -> Optional[List[Dict[str, Any]]]:
+    """Return the rules whose outcome may differ between two configurations.
+
+    The result holds the old and new versions of every added, removed or
+    modified rule. Since the last matching rule wins, a row can only change if
+    one of them matches it (before or after the change) or if it fell back to
+    the default category and the default changed. None means the change cannot
+    be narrowed down (unchanged rules were reordered, duplicate ids, or a new
+    default category) and every row must be re-evaluated.
+    """
+    if old_cfg.get("default_category") != new_cfg.get("default_category"):
+        return None
+    old_rules = old_cfg.get("rules", [])
+    new_rules = new_cfg.get("rules", [])
+    old = {str(r.get("id")): r for r in old_rules}
+    new = {str(r.get("id")): r for r in new_rules}
+    if len(old) != len(old_rules) or len(new) != len(new_rules):
+        return None
+    same = {
+        rid
+        for rid in old.keys() & new.keys()
+        if _fingerprint(old[rid]) == _fingerprint(new[rid])
+    }
+    old_order = [str(r.get("id")) for r in old_rules if str(r.get("id")) in same]
+    new_order = [str(r.get("id")) for r in new_rules if str(r.get("id")) in same]
+    if old_order != new_order:
+        return None
+    return [r for rid, r in old.items() if rid not in same] + [
+        r for rid, r in new.items() if rid not in same
+    ]
+
+
+def _set_columns(*cfgs: Dict[str, Any]) -> List[str]:
+    columns = ["category", "rule_id"]
+    for cfg in cfgs:
+        for rule in cfg.get("rules", []):
+            columns += [c for c in rule.get("set", {}) if c not in columns]
+    return columns
+
+
+def recategorize(
+    db: Database,
+    cfg: Dict[str, Any],
+    old_cfg: Optional[Dict[str, Any]] = None,
+    batch_size: int = 5000,
+) -> Dict[str, Any]:
+    """Re-apply ``cfg`` to the stored transactions in batches.
+
+    With ``old_cfg`` (the rules the table currently reflects) only rows that a
+    changed rule may affect are re-evaluated; otherwise every row is.
+    ``category`` and ``rule_id`` are recomputed; other columns a rule can set
+    are only cleared on rows an old rule matched and only overwritten on rows
+    a new rule matches, so values from the parser survive. Rows paired as
+    internal transfers are left as they are. Only rows whose
+    rule-assigned columns actually change are written back. The rules
+    snapshot and derived aggregates are refreshed afterwards.
+    """
+    summary: Dict[str, Any] = {
+        "mode": "full",
+        "changed_rules": None,
+        "scanned": 0,
+        "evaluated": 0,
+        "updated": 0,
+    }
+    if not inspect(db.engine).has_table("transactions"):
+        db.save_rules(cfg)
+        return summary
+    changed = changed_rules(old_cfg, cfg) if old_cfg is not None else None
+    if changed is not None:
+        summary["mode"] = "incremental"
+        summary["changed_rules"] = sorted({str(r.get("id")) for r in changed})
+    compiled = compile_rules(cfg)
+    triggers = compile_rules({"rules": changed or []})["rules"]
+    # Old rules that wrote columns other than category; only the rows they
+    # matched have those columns reset, other rows keep their parser values.
+    writers = [
+        r
+        for r in (old_cfg or {}).get("rules", [])
+        if set(r.get("set", {})) - {"category"}
+    ]
+    writers = compile_rules({"rules": writers})["rules"]
+    changed_ids: Set[str] = set(summary["changed_rules"] or [])
+    columns = _set_columns(cfg, old_cfg or {})
+
+    existing = {c["name"] for c in inspect(db.engine).get_columns("transactions")}
+    with db.engine.begin() as conn:
+        for col in columns:
+            if col not in existing:
+                conn.execute(text(f'ALTER TABLE transactions ADD COLUMN "{col}" TEXT'))
+
+    select = text(
+        "SELECT rowid AS _rowid, * FROM transactions WHERE rowid > :last "
+        "ORDER BY rowid LIMIT :limit"
+    )
+    update = text(
+        "UPDATE transactions SET "
+        + ", ".join(f'"{c}" = :{c}' for c in columns)
+        + " WHERE rowid = :_rowid"
+    )
+    last = 0
+    # An empty diff (e.g. a reformatted rules file) needs no scan at all.
+    while changed != []:
+        with db.engine.connect() as conn:
+            batch = pd.read_sql_query(
+                select, conn, params={"last": last, "limit": batch_size}
+            )
+        if batch.empty:
+            break
+        last = int(batch["_rowid"].iloc[-1])
+        summary["scanned"] += len(batch)
+        if changed is not None:
+            mask = batch["rule_id"].astype(str).isin(changed_ids)
+            for rule in triggers:
+                mask |= rule_mask(batch, rule.get("when", {}))
+            batch = batch[mask]
+        if "transfer_id" in batch:
+            # Detected transfers keep their Transfer category.
+            batch = batch[batch["transfer_id"].isna()]
+        if batch.empty:
+            continue
+        summary["evaluated"] += len(batch)
+        fresh = batch.copy()
+        fresh[["category", "rule_id"]] = None
+        for rule in writers:
+            mask = rule_mask(fresh, rule.get("when", {}))
+            cols = [c for c in rule["set"] if c != "category"]
+            fresh.loc[mask.to_numpy(), cols] = None
+        fresh = apply_rules(fresh, compiled)
+        before = batch[columns].astype(object).where(batch[columns].notna(), None)
+        after = fresh[columns].astype(object).where(fresh[columns].notna(), None)
+        diff = (before != after).any(axis=1)
+        if not diff.any():
+            continue
+        rows = after[diff].assign(_rowid=batch.loc[diff, "_rowid"])
+        with db.engine.begin() as conn:
+            conn.execute(update, rows.to_dict("records"))
+        summary["updated"] += int(diff.sum())
+        logger.debug("Updated %d rows up to rowid %d", int(diff.sum()), last)
+
+    db.save_rules(cfg)
+    if summary["updated"]:
+        db.refresh_aggregates()
+    return summary
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+ISSUE_COLUMNS = ["account", "kind", "start", "end", "source", "delta"]
+KINDS = ["mismatch", "gap", "overlap", "missing_month"]
+
+
+def _balance_issues(df: pd.DataFrame, tolerance: float) -> pd.DataFrame:
+    """Compare running sums with reported balances.
+
+    For every row with a balance, ``balance - cumsum(amount)`` is the opening
+    balance it implies; consecutive balances of an account must imply the same
+    one. A difference means transactions are missing (or wrong) between the
+    two rows: a ``gap`` when they come from different statements, a
+    ``mismatch`` within one statement.
+    """
+    running = df.groupby("account", observed=True, sort=False)["amount"].cumsum()
+    checked = df.assign(opening=df["balance"] - running)
+    checked = checked[checked["balance"].notna()]
+    grouped = checked.groupby("account", observed=True, sort=False)
+    delta = (checked["opening"] - grouped["opening"].shift()).round(2)
+    bad = delta.abs() > tolerance
+    if not bad.any():
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    prev_date = grouped["date"].shift()[bad]
+    prev_source = grouped["raw_source"].shift()[bad].astype(object)
+    source = checked.loc[bad, "raw_source"].astype(object)
+    return pd.DataFrame(
+        {
+            "account": checked.loc[bad, "account"].astype(object),
+            "kind": np.where(prev_source.eq(source), "mismatch", "gap"),
+            "start": prev_date,
+            "end": checked.loc[bad, "date"],
+            "source": source,
+            "delta": delta[bad],
+        }
+    )
+
+
+def _overlap_issues(df: pd.DataFrame) -> pd.DataFrame:
+    """Flag statements of an account whose date ranges overlap."""
+    spans = (
+        df.groupby(["account", "raw_source"], observed=True)["date"]
+        .agg(["min", "max"])
+        .reset_index()
+        .sort_values(["account", "min", "max"])
+    )
+    prev_end = spans.groupby("account", observed=True)["max"].shift()
+    bad = spans["min"] < prev_end
+    return pd.DataFrame(
+        {
+            "account": spans.loc[bad, "account"].astype(object),
+            "kind": "overlap",
+            "start": spans.loc[bad, "min"],
+            "end": prev_end[bad],
+            "source": spans.loc[bad, "raw_source"].astype(object),
+            "delta": np.nan,
+        }
+    )
+
+
+def _missing_months(df: pd.DataFrame) -> pd.DataFrame:
+    """Flag months without any transaction between an account's first and last."""
+    months = (
+        pd.DataFrame(
+            {
+                "account": df["account"],
+                "month": df["date"].dt.year * 12 + df["date"].dt.month - 1,
+            }
+        )
+        .drop_duplicates()
+        .sort_values(["account", "month"])
+    )
+    prev = months.groupby("account", observed=True)["month"].shift()
+    bad = months["month"] - prev > 1
+
+    def to_date(ordinal: pd.Series) -> pd.Series:
+        ordinal = ordinal.astype(int)
+        return pd.to_datetime(
+            {"year": ordinal // 12, "month": ordinal % 12 + 1, "day": 1}
+        )
+
+    return pd.DataFrame(
+        {
+            "account": months.loc[bad, "account"].astype(object),
+            "kind": "missing_month",
+            "start": to_date(prev[bad] + 1),
+            "end": to_date(months.loc[bad, "month"] - 1),
+            "source": None,
+            "delta": np.nan,
+        }
+    )
+
+
+def condense(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep only what :func:`reconcile` needs from ``df``, in fewer rows.
+
+    Within each account, consecutive rows without a balance that share a date
+    and a statement are summed into one row. Every balance row still sees the
+    same running sum, so concatenating condensed batches reconciles like the
+    full rows (up to float rounding). A statement without balances shrinks to
+    about one row per account and day.
+    """
+    columns = [
+        c for c in ["account", "date", "amount", "balance", "raw_source"] if c in df
+    ]
+    data = df[columns].reset_index(drop=True)
+    if data.empty:
+        return data
+    account = data["account"].astype(str)
+    source = (
+        data["raw_source"].astype(object).fillna("")
+        if "raw_source" in data
+        else pd.Series("", index=data.index)
+    )
+    if "balance" in data:
+        own = data["balance"].notna()
+    else:
+        own = pd.Series(False, index=data.index)
+    keys = pd.DataFrame({"date": data["date"], "source": source, "own": own})
+    prev = keys.groupby(account, sort=False).shift()
+    start = (
+        own
+        | prev["own"].isna()
+        | prev["own"].astype(bool)
+        | keys["date"].ne(prev["date"])
+        | keys["source"].ne(prev["source"])
+    )
+    run = start.groupby(account, sort=False).cumsum()
+    agg = {c: "first" for c in columns if c != "amount"} | {"amount": "sum"}
+    grouped = data.groupby([account, run], sort=False, observed=True).agg(agg)
+    return grouped.reset_index(drop=True)[columns]
+
+
+def reconcile(df: pd.DataFrame, tolerance: float = 0.005) -> pd.DataFrame:
+    """Return balance mismatches, statement gaps and overlaps per account.
+
+    Rows are ordered by account and date (keeping the input order within a
+    day), then checked with grouped cumulative sums and shifts, so the whole
+    frame is handled in a few vectorized passes. Balance checks only run when
+    a ``balance`` column is present; ``missing_month`` flags calendar months
+    without any transaction inside an account's date range.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    columns = ["account", "date", "amount", "raw_source"]
+    if "balance" in df:
+        columns.append("balance")
+    data = df[[c for c in columns if c in df]].copy()
+    if "raw_source" not in data:
+        data["raw_source"] = None
+    data["date"] = pd.to_datetime(data["date"])
+    # Factorize the grouping keys once instead of on every groupby.
+    data["account"] = data["account"].astype("category")
+    data["raw_source"] = data["raw_source"].astype("category")
+    data = data.sort_values(["account", "date"], kind="stable")
+    parts = [_overlap_issues(data), _missing_months(data)]
+    if "balance" in data and data["balance"].notna().any():
+        parts.insert(0, _balance_issues(data, tolerance))
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    issues = pd.concat(parts, ignore_index=True)
+    issues["start"] = pd.to_datetime(issues["start"]).dt.date
+    issues["end"] = pd.to_datetime(issues["end"]).dt.date
+    return issues.sort_values(["account", "start", "kind"], ignore_index=True)
+
+
+def summarize(issues: pd.DataFrame) -> Dict[str, int]:
+    counts = issues["kind"].value_counts()
+    return {kind: int(counts.get(kind, 0)) for kind in KINDS}
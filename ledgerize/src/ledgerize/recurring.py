@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+KEYS = ["account", "norm_desc"]
+# Expected interval in days and accepted deviation for each period.
+PERIODS: Dict[str, Tuple[float, float]] = {
+    "weekly": (7.0, 1.0),
+    "biweekly": (14.0, 2.0),
+    "monthly": (30.44, 3.5),
+    "quarterly": (91.31, 7.0),
+    "yearly": (365.25, 10.0),
+}
+RECURRING_COLUMNS = KEYS + [
+    "currency",
+    "period",
+    "interval_days",
+    "count",
+    "amount",
+    "first_date",
+    "last_date",
+    "next_date",
+]
+
+
+def detect_recurring(
+    df: pd.DataFrame,
+    min_count: int = 3,
+    amount_tolerance: float = 0.1,
+    regularity: float = 0.8,
+) -> pd.DataFrame:
+    """Return periodic series found in ``df``, one row per account and payee.
+
+    Rows are grouped by account and ``norm_desc`` and sorted by date; the
+    median gap between consecutive dates picks the candidate period. A series
+    is kept when it has at least ``min_count`` rows, at least ``regularity``
+    of its gaps are within the period's tolerance, and the same share of its
+    amounts are within ``amount_tolerance`` (relative) of the median amount.
+    All statistics are computed with grouped vectorized operations.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=RECURRING_COLUMNS)
+    data = df[KEYS + ["currency", "date", "amount"]].copy()
+    for col in KEYS + ["currency"]:
+        data[col] = data[col].astype(object)
+    data["date"] = pd.to_datetime(data["date"])
+    data = data.sort_values(KEYS + ["date"], kind="stable")
+    grouped = data.groupby(KEYS, sort=False)
+    data["gap"] = grouped["date"].diff().dt.days
+    median_gap = grouped["gap"].transform("median")
+    conditions = [(median_gap - d).abs() <= tol for d, tol in PERIODS.values()]
+    data["period"] = np.select(conditions, list(PERIODS), default="")
+    target = np.select(conditions, [d for d, _ in PERIODS.values()], default=np.nan)
+    tol = np.select(conditions, [t for _, t in PERIODS.values()], default=np.nan)
+    data["regular"] = (data["gap"] - target).abs() <= tol
+    median_amount = grouped["amount"].transform("median")
+    data["steady"] = (data["amount"] - median_amount).abs() <= (
+        amount_tolerance * median_amount.abs()
+    )
+    stats = data.groupby(KEYS, sort=False).agg(
+        currency=("currency", "first"),
+        period=("period", "first"),
+        interval_days=("gap", "median"),
+        count=("date", "size"),
+        amount=("amount", "median"),
+        first_date=("date", "min"),
+        last_date=("date", "max"),
+        regular=("regular", "sum"),
+        steady=("steady", "mean"),
+    )
+    keep = (
+        (stats["period"] != "")
+        & (stats["count"] >= min_count)
+        & (stats["regular"] >= regularity * (stats["count"] - 1))
+        & (stats["steady"] >= regularity)
+    )
+    stats = stats[keep].reset_index()
+    stats["next_date"] = stats["last_date"] + pd.to_timedelta(
+        stats["interval_days"].round(), unit="D"
+    )
+    for col in ["first_date", "last_date", "next_date"]:
+        stats[col] = stats[col].dt.date
+    return stats[RECURRING_COLUMNS].sort_values(KEYS, ignore_index=True)
@@ -1,21 +1,170 @@
 from __future__ import annotations
 
+import gzip
+import json
+import logging
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
-import plotly.express as px
 from jinja2 import Environment, FileSystemLoader
 
+logger = logging.getLogger(__name__)
 
-def build_report(df: pd.DataFrame, out: Path) -> None:
-    env = Environment(
+# Columns written to the per-month detail shards of the light report.
+SHARD_COLUMNS = ["date", "account", "description", "category", "amount", "currency"]
+# Coarser summaries tried in order until the page fits its size budget:
+# (pandas period frequency, number of categories kept before "Other").
+SUMMARY_LEVELS: List[Tuple[str, int]] = [
+    ("M", 0),
+    ("M", 12),
+    ("Q", 12),
+    ("Q", 6),
+    ("Y", 6),
+    ("Y", 1),
+]
+
+
+def _environment() -> Environment:
+    return Environment(
         loader=FileSystemLoader(Path(__file__).resolve().parent / "templates")
     )
-    tpl = env.get_template("report.html.j2")
+
+
+def _base_currency(df: pd.DataFrame) -> Optional[str]:
+    """Guess the base currency: the one whose rows were converted at rate 1."""
+    known = df[df["amount_base"].notna() & (df["amount"] != 0)]
+    currency = known["currency"].astype(str).str.upper()
+    same = (known["amount_base"] == known["amount"]).groupby(currency).all()
+    bases = list(same[same].index)
+    return bases[0] if len(bases) == 1 else None
+
+
+def _prepare(df: pd.DataFrame, base: Optional[str] = None) -> Tuple[pd.DataFrame, str]:
     df["date"] = pd.to_datetime(df["date"])
+    if "transfer_id" in df:
+        # Both sides of an internal transfer would inflate expenses and income.
+        df = df[df["transfer_id"].isna()]
+    if "amount_base" not in df or df["amount_base"].isna().all():
+        return df, "amount"
+    # Amounts converted to the base currency can be summed across currencies.
+    # Rows in the base currency imported before conversion was enabled keep
+    # their amount; rows without a rate stay NaN and are left out of totals.
+    if base is None:
+        base = _base_currency(df)
+        logger.warning(
+            "No base currency configured (--base-currency or base_currency in "
+            "the accounts file); guessed %s from the data",
+            base or "none",
+        )
+    base = base.upper() if base else None
+    in_base = df["currency"].astype(str).str.upper() == base
+    df = df.assign(amount_base=df["amount_base"].fillna(df["amount"].where(in_base)))
+    missing = int(df["amount_base"].isna().sum())
+    if missing:
+        logger.warning(
+            "%d rows without an FX rate to %s are left out of the totals",
+            missing,
+            base or "the base currency",
+        )
+    return df, "amount_base"
+
+
+def build_report(df: pd.DataFrame, out: Path, base: Optional[str] = None) -> None:
+    import plotly.express as px
+
+    tpl = _environment().get_template("report.html.j2")
+    df, value = _prepare(df, base)
     by_month = (
-        df.groupby([pd.Grouper(key="date", freq="M"), "category"]).sum().reset_index()
+        df.groupby([pd.Grouper(key="date", freq="M"), "category"], observed=True)[value]
+        .sum()
+        .reset_index()
     )
-    fig = px.bar(by_month, x="date", y="amount", color="category")
+    fig = px.bar(by_month, x="date", y=value, color="category")
     out.parent.mkdir(parents=True, exist_ok=True)
     out.write_text(tpl.render(figure=fig.to_plotly_json()))
+
+
+def summarize(df: pd.DataFrame, value: str, freq: str, top: int) -> Dict[str, Any]:
+    """Return totals per period and category as plain lists.
+
+    With ``top`` > 0 only the ``top`` categories with the largest absolute
+    totals are kept and the rest is folded into ``Other``.
+    """
+    category = df["category"].astype(object).fillna("Uncategorized")
+    if top:
+        totals = df[value].abs().groupby(category).sum()
+        kept = set(totals.nlargest(top).index)
+        category = category.where(category.isin(kept), "Other")
+    periods = df["date"].dt.to_period(freq)
+    table = df[value].groupby([periods, category]).sum().unstack(fill_value=0.0)
+    table = table.round(2)
+    return {
+        "title": f"Totals per {dict(M='month', Q='quarter', Y='year')[freq]}",
+        "periods": [str(p) for p in table.index],
+        "series": {str(c): table[c].tolist() for c in table.columns},
+    }
+
+
+def write_shards(df: pd.DataFrame, shard_dir: Path) -> List[str]:
+    """Write one gzipped JSON file of transactions per month; return the months.
+
+    Shards left by an earlier report are removed first.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    for stale in shard_dir.glob("*.json.gz"):
+        stale.unlink()
+    columns = [c for c in SHARD_COLUMNS if c in df]
+    months = df["date"].dt.strftime("%Y-%m")
+    written = []
+    for month, rows in df.groupby(months, sort=True):
+        rows = rows.sort_values("date")[columns].assign(
+            date=rows["date"].dt.strftime("%Y-%m-%d")
+        )
+        payload = {
+            "columns": columns,
+            "rows": rows.astype(object).where(rows.notna(), None).values.tolist(),
+        }
+        data = json.dumps(payload, default=str, separators=(",", ":")).encode()
+        (shard_dir / f"{month}.json.gz").write_bytes(gzip.compress(data, mtime=0))
+        written.append(str(month))
+    return written
+
+
+def build_light_report(
+    df: pd.DataFrame,
+    out: Path,
+    budget: int = 256_000,
+    months: Optional[int] = None,
+    base: Optional[str] = None,
+) -> int:
+    """Write a small report page plus per-month detail shards; return its size.
+
+    The page only embeds pre-aggregated totals per period and category. They
+    get coarser (fewer categories, then quarters, then years) until the page
+    fits in ``budget`` bytes. Transactions go to gzipped JSON shards in
+    ``<out stem>_shards/``, which the page fetches when a month is selected.
+    With ``months``, only the latest ``months`` months with transactions are
+    covered. ``base`` is the currency of ``amount_base``; it is guessed from
+    the data when None.
+    """
+    tpl = _environment().get_template("report_light.html.j2")
+    df, value = _prepare(df, base)
+    if months is not None:
+        periods = df["date"].dt.to_period("M")
+        df = df[periods.isin(sorted(periods.unique())[-months:])]
+    out.parent.mkdir(parents=True, exist_ok=True)
+    shard_dir = out.parent / f"{out.stem}_shards"
+    shards = write_shards(df, shard_dir)
+    html = ""
+    for freq, top in SUMMARY_LEVELS:
+        summary = summarize(df, value, freq, top)
+        html = tpl.render(summary=summary, shards=shards, shard_dir=shard_dir.name)
+        if len(html.encode()) <= budget:
+            break
+    else:
+        logger.warning(
+            "Report page is %d bytes, over the %d byte budget", len(html), budget
+        )
+    out.write_text(html)
+    return len(html.encode())
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .rules import compile_rules, rule_mask
+
+try:
+    from re import _constants as sre_constants  # type: ignore[attr-defined]
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_constants  # type: ignore[no-redef]
+    import sre_parse  # type: ignore[no-redef]
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+
+
+@dataclass
+class RuleStat:
+    id: str
+    position: int
+    time_s: float = 0.0
+    matches: int = 0
+    overridden: int = 0
+    status: str = "ok"
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def effective(self) -> int:
+        return self.matches - self.overridden
+
+
+def _iter_regexes(cond: Dict[str, Any]) -> Iterator[str]:
+    regex = cond.get("regex")
+    if regex is not None:
+        yield regex.pattern if isinstance(regex, re.Pattern) else str(regex)
+    for key in ("any", "all"):
+        for sub in cond.get(key, []):
+            yield from _iter_regexes(sub)
+
+
+def _is_unbounded(av: Any) -> bool:
+    return av[1] == sre_constants.MAXREPEAT or av[1] > 16
+
+
+def _first_chars(items: Any) -> Optional[set]:
+    """Return the literal first characters of a branch, None if unknown."""
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            return {av}
+        if op == sre_constants.SUBPATTERN:
+            return _first_chars(av[-1])
+        return None
+    return set()
+
+
+def _scan(items: Any, in_repeat: bool, found: List[str]) -> None:
+    for op, av in items:
+        if op in _REPEATS:
+            unbounded = _is_unbounded(av)
+            if unbounded and in_repeat:
+                found.append("nested quantifier")
+            _scan(av[2], in_repeat or unbounded, found)
+        elif op == sre_constants.SUBPATTERN:
+            _scan(av[-1], in_repeat, found)
+        elif op == sre_constants.BRANCH:
+            branches = av[1]
+            if in_repeat:
+                seen: set = set()
+                for branch in branches:
+                    first = _first_chars(branch)
+                    if first is None or first & seen:
+                        found.append("overlapping alternation inside a quantifier")
+                        break
+                    seen |= first
+            for branch in branches:
+                _scan(branch, in_repeat, found)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            _scan(av[1], in_repeat, found)
+
+
+def backtracking_risks(pattern: str) -> List[str]:
+    """Return reasons why ``pattern`` may backtrack catastrophically.
+
+    This is a heuristic on the parsed pattern: it flags unbounded quantifiers
+    nested inside other unbounded quantifiers (``(a+)+``) and alternations
+    whose branches can start with the same character inside a quantifier
+    (``(x|\\wy)*``). Unparseable patterns are reported as such.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error as exc:
+        return [f"invalid regex: {exc}"]
+    found: List[str] = []
+    _scan(parsed, False, found)
+    return sorted(set(found))
+
+
+def rule_stats(df: pd.DataFrame, cfg: Dict[str, Any]) -> List[RuleStat]:
+    """Evaluate every rule of ``cfg`` on ``df`` and collect per-rule statistics.
+
+    ``overridden`` counts the rows a rule matched but a later rule also
+    matched (later rules win in :func:`apply_rules`). A rule is ``dead`` when
+    it matches nothing and ``shadowed`` when every row it matches is
+    overridden.
+    """
+    compiled = compile_rules(cfg)
+    winner = np.full(len(df), -1)
+    stats: List[RuleStat] = []
+    for position, (raw, rule) in enumerate(
+        zip(cfg.get("rules", []), compiled["rules"])
+    ):
+        stat = RuleStat(str(rule.get("id")), position)
+        for pattern in _iter_regexes(raw.get("when", {})):
+            stat.warnings += [f"{pattern}: {w}" for w in backtracking_risks(pattern)]
+        start = time.perf_counter()
+        mask = rule_mask(df, rule.get("when", {})).to_numpy()
+        stat.time_s = time.perf_counter() - start
+        stat.matches = int(mask.sum())
+        winner[mask] = position
+        stats.append(stat)
+    for stat in stats:
+        stat.overridden = stat.matches - int((winner == stat.position).sum())
+        if stat.matches == 0:
+            stat.status = "dead"
+        elif stat.effective == 0:
+            stat.status = "shadowed"
+    return stats
+
+
+def stats_to_dict(stats: List[RuleStat], rows: int) -> Dict[str, Any]:
+    return {
+        "rows": rows,
+        "total_time_s": sum(s.time_s for s in stats),
+        "rules": [{**asdict(s), "effective": s.effective} for s in stats],
+    }
+
+
+def format_stats(stats: List[RuleStat]) -> str:
+    """Render ``stats`` as a text table, slowest rules first."""
+    header = f"{'rule':<24} {'time_ms':>9} {'matches':>8} {'overridden':>10}  status"
+    lines = [header]
+    for s in sorted(stats, key=lambda s: s.time_s, reverse=True):
+        lines.append(
+            f"{s.id[:24]:<24} {s.time_s * 1000:>9.2f} {s.matches:>8} "
+            f"{s.overridden:>10}  {s.status}"
+        )
+        lines += [f"  ! {w}" for w in s.warnings]
+    return "\n".join(lines)
@@ -1,10 +1,38 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
 
+from . import audit
+from .compact import add_category, compact_frame, is_compact
+
+
+def compile_rules(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of ``cfg`` with every ``regex`` condition precompiled.
+
+    ``re.search`` accepts compiled patterns, so the result can be passed to
+    :func:`apply_rules` unchanged; long-running processes avoid relying on
+    the bounded ``re`` module cache.
+    """
+
+    def compile_cond(cond: Dict[str, Any]) -> Dict[str, Any]:
+        cond = dict(cond)
+        if isinstance(cond.get("regex"), str):
+            cond["regex"] = re.compile(cond["regex"])
+        for key in ("any", "all"):
+            if key in cond:
+                cond[key] = [compile_cond(c) for c in cond[key]]
+        return cond
+
+    compiled = dict(cfg)
+    compiled["rules"] = [
+        {**rule, "when": compile_cond(rule.get("when", {}))}
+        for rule in cfg.get("rules", [])
+    ]
+    return compiled
+
 
 def _check(row: pd.Series, cond: Dict[str, Any]) -> bool:
     if "regex" in cond:
@@ -26,16 +54,47 @@ def _eval_when(row: pd.Series, when: Dict[str, Any]) -> bool:
     return _check(row, when)
 
 
-def apply_rules(df: pd.DataFrame, cfg: Dict[str, Any]) -> pd.DataFrame:
+def rule_mask(df: pd.DataFrame, when: Dict[str, Any]) -> pd.Series:
+    """Return a boolean Series marking the rows of ``df`` matched by ``when``."""
+    if df.empty:
+        return pd.Series(False, index=df.index, dtype=bool)
+    return df.apply(lambda r: _eval_when(r, when), axis=1).astype(bool)
+
+
+def _assign(df: pd.DataFrame, mask: pd.Series, col: str, value: Any) -> None:
+    if col in df:
+        df[col] = add_category(df[col], value)
+    df.loc[mask, col] = value
+
+
+def apply_rules(
+    df: pd.DataFrame, cfg: Dict[str, Any], hits: Optional[Dict[str, int]] = None
+) -> pd.DataFrame:
+    """Categorize ``df`` with ``cfg``; later rules override earlier ones.
+
+    If ``hits`` is given, the number of rows matched by each rule id is
+    added to it. While an audit log is open, the final rule of every matched
+    row is recorded as a ``rule_match`` event.
+    """
+    compact = is_compact(df)
     df = df.copy()
     for rule in cfg.get("rules", []):
-        mask = df.apply(lambda r: _eval_when(r, rule.get("when", {})), axis=1)
+        mask = rule_mask(df, rule.get("when", {}))
+        if hits is not None:
+            rule_id = str(rule.get("id"))
+            hits[rule_id] = hits.get(rule_id, 0) + int(mask.sum())
         for col, value in rule.get("set", {}).items():
-            df.loc[mask, col] = value
-        df.loc[mask, "rule_id"] = rule.get("id")
+            _assign(df, mask, col, value)
+        _assign(df, mask, "rule_id", rule.get("id"))
     if "default_category" in cfg:
-        df["category"].fillna(cfg["default_category"], inplace=True)
-    return df
+        default = cfg["default_category"]
+        df["category"] = add_category(df["category"], default).fillna(default)
+    if audit.enabled() and "rule_id" in df:
+        matched = df[df["rule_id"].notna()]
+        audit.emit_frame(
+            "rule_match", matched, ["id", "raw_source", "rule_id", "category"]
+        )
+    return compact_frame(df) if compact else df
 
 
 def explain_transaction(tx: Dict[str, Any]) -> str:
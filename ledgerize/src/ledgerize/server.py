@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .client import discovery_file
+from .db import Store, open_database
+from .rules import explain_transaction
+
+logger = logging.getLogger(__name__)
+
+Params = Dict[str, str]
+Route = Callable[[Store, Params], Tuple[int, Any]]
+
+
+def _explain(db: Store, params: Params) -> Tuple[int, Any]:
+    tx = db.find_transaction(params.get("q", ""))
+    if tx is None:
+        return 404, {"error": "Transaction not found"}
+    return 200, {"transaction": tx, "rule": explain_transaction(tx)}
+
+
+def _transactions(db: Store, params: Params) -> Tuple[int, Any]:
+    return 200, db.query_transactions(
+        account=params.get("account"),
+        category=params.get("category"),
+        since=params.get("since"),
+        until=params.get("until"),
+        limit=int(params.get("limit", 1000)),
+    )
+
+
+def _monthly(db: Store, params: Params) -> Tuple[int, Any]:
+    return 200, db.monthly_totals(int(params.get("months", 12)))
+
+
+def _health(db: Store, params: Params) -> Tuple[int, Any]:
+    return 200, {"db": str(db.path), "pid": os.getpid()}
+
+
+ROUTES: Dict[str, Route] = {
+    "/explain": _explain,
+    "/transactions": _transactions,
+    "/monthly": _monthly,
+    "/health": _health,
+}
+
+
+class LedgerServer(ThreadingHTTPServer):
+    """HTTP server sharing one warm database (and its pool)."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], database: Store) -> None:
+        super().__init__(address, _Handler)
+        self.database = database
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: LedgerServer
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        route = ROUTES.get(url.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if route is None:
+            status, payload = 404, {"error": f"Unknown endpoint {url.path}"}
+        else:
+            try:
+                status, payload = route(self.server.database, params)
+            except ValueError as exc:
+                status, payload = 400, {"error": str(exc)}
+            except Exception:
+                logger.exception("Failed to answer %s", self.path)
+                status, payload = 500, {"error": "Internal server error"}
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def advertise(server: LedgerServer, db_path: Path) -> Path:
+    """Write the discovery file through which CLI clients find ``server``."""
+    discovery = discovery_file(db_path)
+    discovery.write_text(
+        json.dumps(
+            {"url": server.url, "pid": os.getpid(), "db": str(db_path.resolve())}
+        )
+    )
+    return discovery
+
+
+def serve_forever(
+    db_path: Path,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    on_ready: Optional[Callable[[str], None]] = None,
+) -> None:
+    """Serve ``db_path`` until interrupted, advertising the URL next to it."""
+    server = LedgerServer((host, port), open_database(db_path))
+    discovery = advertise(server, db_path)
+    if on_ready is not None:
+        on_ready(server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        discovery.unlink(missing_ok=True)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import logging
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .compact import add_category
+from .utils import sha1_hash
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_CATEGORY = "Transfer"
+
+
+def _candidates(
+    days: np.ndarray,
+    group: np.ndarray,
+    account: np.ndarray,
+    out: np.ndarray,
+    inflow: np.ndarray,
+    window: int,
+    limit: int,
+) -> pd.DataFrame:
+    """Return outflow/inflow pairs of the same bucket within ``window`` days.
+
+    Inflows are sorted by (bucket, day); each outflow binary-searches its
+    position and takes at most ``limit`` inflows on either side, so the join
+    stays linear even when one amount repeats thousands of times. Pairs are
+    ordered by date distance, then position.
+    """
+    # Buckets are dense integers and days fit well below 2**24.
+    span = np.int64(1 << 24)
+    inflow = inflow[np.argsort(group[inflow] * span + days[inflow], kind="stable")]
+    keys = group[inflow] * span + days[inflow]
+    key_out = group[out] * span + days[out]
+    lo = np.searchsorted(keys, key_out - window, side="left")
+    hi = np.searchsorted(keys, key_out + window, side="right")
+    mid = np.searchsorted(keys, key_out)
+    start = np.maximum(lo, mid - limit)
+    stop = np.minimum(hi, mid + limit)
+    counts = stop - start
+    pos_out = np.repeat(out, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    pos_in = inflow[np.repeat(start, counts) + offsets]
+    keep = account[pos_out] != account[pos_in]
+    pos_out, pos_in = pos_out[keep], pos_in[keep]
+    gap = np.abs(days[pos_in] - days[pos_out])
+    # One int64 sort key instead of a three-column lexsort.
+    n = np.int64(len(days))
+    order = np.argsort((gap * n + pos_out) * n + pos_in, kind="stable")
+    return pd.DataFrame({"pos_out": pos_out[order], "pos_in": pos_in[order]})
+
+
+def detect_transfers(
+    df: pd.DataFrame,
+    window: int = 3,
+    category: str = TRANSFER_CATEGORY,
+    limit: int = 8,
+) -> pd.DataFrame:
+    """Tag pairs of opposite amounts moving between two accounts.
+
+    An outflow and an inflow match when they share currency and absolute
+    amount, belong to different accounts and are at most ``window`` days
+    apart. Pairs are picked in greedy rounds: in each round every row keeps
+    only its closest remaining counterpart, and pairs that choose each other
+    are accepted. Each round considers the ``limit`` nearest inflows on
+    either side of an outflow; rows left over are retried with new neighbours
+    until a round matches nothing. Matched rows get a shared ``transfer_id``,
+    ``category`` and ``rule_id`` ``"transfer"``; other rows get a null
+    ``transfer_id``.
+    """
+    df = df.copy()
+    transfer_ids = np.full(len(df), None, dtype=object)
+    amount = df["amount"].to_numpy(dtype="float64")
+    days = pd.to_datetime(df["date"]).to_numpy("datetime64[D]").astype("int64")
+    account = df["account"].astype(str).to_numpy()
+    cents = np.rint(np.abs(amount) * 100).astype("int64")
+    currency = pd.factorize(df["currency"].astype(str))[0].astype("int64")
+    group = pd.factorize(currency * (cents.max(initial=0) + 1) + cents)[0]
+    group = group.astype("int64")
+    unmatched = np.ones(len(df), dtype=bool)
+    matched_out: List[np.ndarray] = []
+    matched_in: List[np.ndarray] = []
+    while True:
+        out = np.flatnonzero(unmatched & (amount < 0))
+        inflow = np.flatnonzero(unmatched & (amount > 0))
+        if not len(out) or not len(inflow):
+            break
+        pairs = _candidates(days, group, account, out, inflow, window, limit)
+        found = 0
+        while len(pairs):
+            best_out = pairs.drop_duplicates("pos_out")
+            best_in = pairs.drop_duplicates("pos_in")
+            mutual = best_out.merge(best_in, on=["pos_out", "pos_in"])
+            matched_out.append(mutual["pos_out"].to_numpy())
+            matched_in.append(mutual["pos_in"].to_numpy())
+            found += len(mutual)
+            pairs = pairs[
+                ~pairs["pos_out"].isin(mutual["pos_out"])
+                & ~pairs["pos_in"].isin(mutual["pos_in"])
+            ]
+        if not found:
+            break
+        # Rows whose capped candidates were all taken get fresh neighbours.
+        unmatched[np.concatenate(matched_out)] = False
+        unmatched[np.concatenate(matched_in)] = False
+    if matched_out:
+        pos_out = np.concatenate(matched_out)
+        pos_in = np.concatenate(matched_in)
+        ids = df["id"].astype(str).to_numpy()
+        pair_ids = [sha1_hash(a, b)[:16] for a, b in zip(ids[pos_out], ids[pos_in])]
+        transfer_ids[pos_out] = pair_ids
+        transfer_ids[pos_in] = pair_ids
+        logger.info("Matched %d internal transfers", len(pair_ids))
+    df["transfer_id"] = transfer_ids
+    mask = df["transfer_id"].notna()
+    if mask.any():
+        df["category"] = add_category(df["category"], category)
+        df.loc[mask, "category"] = category
+        if "rule_id" in df:
+            df["rule_id"] = add_category(df["rule_id"], "transfer")
+        df.loc[mask, "rule_id"] = "transfer"
+    return df
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic import TypeAdapter, ValidationError
+
+from . import audit
+from .types import Transaction
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = [
+    name for name, field in Transaction.model_fields.items() if field.is_required()
+]
+STRING_FIELDS = [
+    name
+    for name in Transaction.model_fields
+    if name not in ("date", "amount", "balance", "raw_rownum")
+]
+NUMERIC_FIELDS = ["amount", "balance", "raw_rownum"]
+CURRENCY_PATTERN = r"[A-Z]{3}"
+MIN_DATE = date(1970, 1, 1)
+# ``pandas.api.types.infer_dtype`` results that need no per-row type check.
+_TRUSTED_KINDS = {
+    "str": {"string", "empty"},
+    "date": {"date", "empty"},
+    "number": {"integer", "floating", "mixed-integer-float", "empty"},
+}
+
+_ADAPTER = TypeAdapter(List[Transaction])
+
+
+def _fullmatch(series: pd.Series, pattern: str) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        cats = series.cat.categories
+        valid = cats[cats.astype(str).str.fullmatch(pattern)]
+        return series.isin(valid)
+    return series.astype("string").str.fullmatch(pattern).fillna(False).astype(bool)
+
+
+def _kind(field: str) -> str:
+    if field in NUMERIC_FIELDS:
+        return "number"
+    return "date" if field == "date" else "str"
+
+
+def _type_ok(field: str, value: object) -> bool:
+    kind = _kind(field)
+    if kind == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kind == "date":
+        return isinstance(value, date)
+    return isinstance(value, str)
+
+
+def _needs_model_check(series: pd.Series, field: str) -> pd.Series:
+    """Flag rows whose value type cannot be trusted from the column dtype."""
+    dtype = series.dtype
+    if (
+        (field in NUMERIC_FIELDS and pd.api.types.is_numeric_dtype(dtype))
+        or (field == "date" and pd.api.types.is_datetime64_any_dtype(dtype))
+        or (field in STRING_FIELDS and isinstance(dtype, pd.StringDtype))
+    ):
+        return pd.Series(False, index=series.index)
+    if isinstance(dtype, pd.CategoricalDtype):
+        bad = [c for c in series.cat.categories if not _type_ok(field, c)]
+        return series.isin(bad)
+    if not pd.api.types.is_object_dtype(dtype):
+        return series.notna()
+    if pd.api.types.infer_dtype(series, skipna=True) in _TRUSTED_KINDS[_kind(field)]:
+        return pd.Series(False, index=series.index)
+    ok = series.map(lambda v: _type_ok(field, v)).astype(bool)
+    return series.notna() & ~ok
+
+
+def _model_errors(df: pd.DataFrame) -> pd.Series:
+    fields = [c for c in Transaction.model_fields if c in df]
+    sub = df[fields].astype(object)
+    records = sub.where(sub.notna(), None).to_dict("records")
+    try:
+        _ADAPTER.validate_python(records)
+    except ValidationError as exc:
+        reasons: dict = {}
+        for err in exc.errors():
+            pos, *loc = err["loc"]
+            label = df.index[int(pos)]
+            field = ".".join(str(p) for p in loc)
+            reasons.setdefault(label, []).append(f"{field}: {err['msg']}")
+        return pd.Series({k: "; ".join(v) for k, v in reasons.items()}, dtype=object)
+    return pd.Series(dtype=object)
+
+
+def validate_frame(
+    df: pd.DataFrame,
+    min_date: date = MIN_DATE,
+    max_date: Optional[date] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split ``df`` into valid rows and rejected rows with a ``reason`` column.
+
+    Checks run column by column; only rows whose values do not have the
+    expected Python type are validated against :class:`Transaction`.
+    """
+    max_date = max_date or date.today() + timedelta(days=366)
+    checks: List[Tuple[str, pd.Series]] = []
+    for col in REQUIRED_FIELDS:
+        if col not in df:
+            checks.append((f"missing column {col}", pd.Series(True, index=df.index)))
+        else:
+            checks.append((f"{col} is null", df[col].isna()))
+    if "amount" in df:
+        amount = pd.to_numeric(df["amount"], errors="coerce")
+        checks.append(
+            (
+                "amount is not a finite number",
+                df["amount"].notna() & ~np.isfinite(amount),
+            )
+        )
+    if "currency" in df:
+        checks.append(
+            (
+                "invalid currency code",
+                df["currency"].notna() & ~_fullmatch(df["currency"], CURRENCY_PATTERN),
+            )
+        )
+    if "date" in df:
+        dates = pd.to_datetime(df["date"], errors="coerce")
+        checks.append(("invalid date", df["date"].notna() & dates.isna()))
+        out_of_range = (dates < pd.Timestamp(min_date)) | (
+            dates > pd.Timestamp(max_date)
+        )
+        checks.append(("date out of range", out_of_range))
+
+    failed = pd.Series(False, index=df.index)
+    for _, mask in checks:
+        failed |= mask
+    reasons = pd.Series("", index=df.index[failed.to_numpy()], dtype=object)
+    for reason, mask in checks:
+        hit = mask[failed]
+        if hit.any():
+            reasons[hit.to_numpy()] += reason + "; "
+
+    suspect = pd.Series(False, index=df.index)
+    for col in Transaction.model_fields:
+        if col in df:
+            suspect |= _needs_model_check(df[col], col)
+    suspect &= ~failed
+    if suspect.any():
+        logger.debug("Running model validation on %d rows", int(suspect.sum()))
+        model = _model_errors(df[suspect])
+        if not model.empty:
+            failed[model.index] = True
+            reasons = pd.concat([reasons, model + "; "])
+
+    rejects = df[failed].copy()
+    rejects["reason"] = reasons.reindex(rejects.index).str.rstrip("; ")
+    audit.emit_frame("rejected", rejects, ["id", "raw_source", "reason"])
+    return df[~failed], rejects
+
+
+def write_rejects(rejects: pd.DataFrame, path: Path) -> None:
+    rejects.to_csv(path, index=False)
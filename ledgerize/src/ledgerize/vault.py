@@ -8,14 +8,18 @@ import tarfile
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import keyring
 
+if TYPE_CHECKING:
+    from .db import Database
+
 SERVICE = "ledgerize"
 KEY_NAME = "master_key"
 MAGIC = b"LZV1"
+DB_NAME = "ledgerize.db"
 
 
 def init_vault() -> str:
@@ -80,7 +84,8 @@ def lock(data_dir: Path, vault_file: Path, key: Optional[bytes] = None) -> None:
         f.write(ct)
 
 
-def unlock(vault_file: Path, out_dir: Path, key: Optional[bytes] = None) -> None:
+def _decrypt(vault_file: Path, key: Optional[bytes] = None) -> bytes:
+    """Return the decrypted ``tar.gz`` payload of ``vault_file``."""
     key = key or _load_key()
     data = vault_file.read_bytes()
     if not data.startswith(MAGIC):
@@ -95,8 +100,40 @@ def unlock(vault_file: Path, out_dir: Path, key: Optional[bytes] = None) -> None
     idx += 12
     ct = data[idx:]
     aesgcm = AESGCM(key)
-    payload = aesgcm.decrypt(nonce, ct, MAGIC + mbytes)
+    return aesgcm.decrypt(nonce, ct, MAGIC + mbytes)
+
+
+def unlock(vault_file: Path, out_dir: Path, key: Optional[bytes] = None) -> None:
+    payload = _decrypt(vault_file, key)
     out_dir.mkdir(parents=True, exist_ok=True)
     buf = io.BytesIO(payload)
     with tarfile.open(fileobj=buf, mode="r:gz") as tar:
         tar.extractall(out_dir)
+
+
+def read_member(vault_file: Path, name: str, key: Optional[bytes] = None) -> bytes:
+    """Return the content of the file ``name`` stored in ``vault_file``.
+
+    Nothing is written to disk: the payload is decrypted and unpacked in
+    memory.
+    """
+    payload = io.BytesIO(_decrypt(vault_file, key))
+    # Stream mode reads the archive once and stops at ``name``; random access
+    # on a gzip stream would decompress it again to seek back to the member.
+    with tarfile.open(fileobj=payload, mode="r|gz") as tar:
+        for member in tar:
+            if member.name == name:
+                content = tar.extractfile(member)
+                if content is not None:
+                    return content.read()
+    raise ValueError(f"{vault_file} does not contain {name}")
+
+
+def load_database(
+    vault_file: Path, key: Optional[bytes] = None, compact: bool = False
+) -> "Database":
+    """Open the ``ledgerize.db`` stored in ``vault_file`` as an in-memory database."""
+    from .db import Database
+
+    image = read_member(vault_file, DB_NAME, key)
+    return Database.from_bytes(image, vault_file, compact=compact)
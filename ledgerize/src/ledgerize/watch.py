@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .db import Database, record_rules
+from .parsers import parse_file
+from .rules import apply_rules, compile_rules
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "watch_state.json"
+
+
+@dataclass
+class IngestResult:
+    path: Path
+    rows: int
+    written: int
+    latency_s: float
+    lag_s: float
+
+
+class Watcher:
+    """Ingest new or modified CSV files from ``input_dir`` as they appear.
+
+    Rules are compiled once and the database engine stays open between
+    polls. A file is only picked up once its modification time is at least
+    ``settle`` seconds old, so statements still being written are skipped
+    until the writer is done. Processed files are remembered by
+    ``(mtime_ns, size)`` in ``watch_state.json`` next to the database.
+    """
+
+    def __init__(
+        self,
+        input_dir: Path,
+        db: Database,
+        rule_cfg: Dict[str, Any],
+        acc_cfg: List[Dict[str, str]],
+        currency: str = "EUR",
+        settle: float = 2.0,
+        compact: bool = False,
+    ) -> None:
+        self.input_dir = input_dir
+        self.db = db
+        self.rules = rule_cfg
+        self.rule_cfg = compile_rules(rule_cfg)
+        # Rows from an earlier import may have been categorized differently.
+        self.fresh: Optional[bool] = not db.path.exists()
+        self.acc_cfg = acc_cfg
+        self.currency = currency
+        self.settle = settle
+        self.compact = compact
+        self.state_path = db.path.parent / STATE_FILE
+        self.seen: Dict[str, Tuple[int, int]] = {}
+        if self.state_path.exists():
+            raw = json.loads(self.state_path.read_text())
+            self.seen = {k: (v[0], v[1]) for k, v in raw.items()}
+
+    def pending(self, now: Optional[float] = None) -> List[Tuple[Path, os.stat_result]]:
+        """Return settled files that are new or changed since their last ingest."""
+        now = time.time() if now is None else now
+        ready = []
+        for path in sorted(self.input_dir.rglob("*.csv")):
+            try:
+                st = path.stat()
+            except OSError:
+                # Deleted or renamed since the directory was listed.
+                continue
+            if self.seen.get(str(path)) == (st.st_mtime_ns, st.st_size):
+                continue
+            if now - st.st_mtime < self.settle:
+                continue
+            ready.append((path, st))
+        return ready
+
+    def ingest(self, path: Path, st: os.stat_result) -> IngestResult:
+        start = time.perf_counter()
+        df = parse_file(
+            path, self.acc_cfg, currency=self.currency, compact=self.compact
+        )
+        df = apply_rules(df, self.rule_cfg)
+        rows = len(df)
+        known = self.db.existing_ids(df["id"])
+        if known:
+            df = df[~df["id"].isin(known)]
+        written = self.db.ingest_dataframe(df) if len(df) else 0
+        if written and self.fresh is not None:
+            record_rules(self.db, self.rules, self.fresh)
+            self.fresh = None
+        self.seen[str(path)] = (st.st_mtime_ns, st.st_size)
+        self._save_state()
+        latency = time.perf_counter() - start
+        return IngestResult(path, rows, written, latency, time.time() - st.st_mtime)
+
+    def poll_once(self) -> List[IngestResult]:
+        results = []
+        for path, st in self.pending():
+            try:
+                results.append(self.ingest(path, st))
+            except Exception:
+                logger.exception("Failed to ingest %s", path)
+                # Retry only once the file changes again.
+                self.seen[str(path)] = (st.st_mtime_ns, st.st_size)
+                self._save_state()
+        return results
+
+    def run(
+        self,
+        interval: float = 2.0,
+        on_ingest: Optional[Callable[[IngestResult], None]] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for result in self.poll_once():
+                if on_ingest is not None:
+                    on_ingest(result)
+            stop.wait(interval)
+
+    def _save_state(self) -> None:
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({k: list(v) for k, v in self.seen.items()}))
+        tmp.replace(self.state_path)
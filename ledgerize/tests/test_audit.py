@@ -0,0 +1,77 @@
+import json
+import logging
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from ledgerize import audit
+from ledgerize.cli import main
+
+BASE = Path(__file__).resolve().parent.parent
+
+
+def test_import_audit_log(tmp_path: Path) -> None:
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    sample = (BASE / "samples/n26_2025-06.csv").read_text()
+    (inbox / "n26_a.csv").write_text(sample)
+    (inbox / "n26_b.csv").write_text(sample)
+    log_path = tmp_path / "audit.jsonl"
+    result = CliRunner().invoke(
+        main,
+        [
+            "import",
+            str(inbox),
+            "--rules",
+            str(BASE / "samples/rules.yml"),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--out",
+            str(tmp_path / "out"),
+            "--audit-log",
+            str(log_path),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert not audit.enabled()
+    events = [json.loads(line) for line in log_path.read_text().splitlines()]
+    dupes = [e for e in events if e["event"] == "duplicate"]
+    assert len(dupes) == len(sample.splitlines()) - 1
+    assert {e["reason"] for e in dupes} == {"id"}
+    matches = [e for e in events if e["event"] == "rule_match"]
+    assert any(e["category"] == "Groceries" for e in matches)
+    assert {"id", "raw_source", "rule_id", "ts"} <= set(matches[0])
+
+
+def test_audit_log_batches_and_summarizes(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    path = tmp_path / "audit.jsonl"
+    audit.emit("ignored", [{"id": "x"}])
+    with caplog.at_level(logging.INFO, logger="ledgerize.audit"):
+        with audit.AuditLog(path, batch_size=3) as log:
+            with pytest.raises(RuntimeError):
+                audit.AuditLog(tmp_path / "other.jsonl").__enter__()
+            assert not (tmp_path / "other.jsonl").exists()
+            audit.emit("duplicate", [{"id": str(i)} for i in range(5)])
+            audit.emit("parse_error", [{"file": "a.csv", "error": "bad"}])
+        assert log.handler.counts == {"duplicate": 5, "parse_error": 1}
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["duplicate"] * 5 + [
+        "parse_error"
+    ]
+    summaries = [r.getMessage() for r in caplog.records if "Audit log" in r.message]
+    assert summaries == [f"Audit log {path}: 5 duplicate, 1 parse_error"]
+
+
+def test_audit_log_flushes_on_a_timer(tmp_path: Path) -> None:
+    # The directory is created when the log is opened.
+    path = tmp_path / "logs" / "audit.jsonl"
+    with audit.AuditLog(path, flush_interval=0.05):
+        audit.emit("duplicate", [{"id": "1"}])
+        deadline = time.monotonic() + 5
+        while not path.read_text() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert json.loads(path.read_text())["id"] == "1"
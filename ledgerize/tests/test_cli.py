@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import pandas as pd
@@ -73,3 +74,163 @@ def test_dedupe() -> None:
     )
     deduped = dedupe(df)
     assert len(deduped) == 1
+
+
+def test_import_profile(tmp_path: Path) -> None:
+    runner = CliRunner()
+    out_dir = tmp_path / "data"
+    result = runner.invoke(
+        main,
+        [
+            "import",
+            str(BASE / "samples"),
+            "--rules",
+            str(BASE / "samples/rules.yml"),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--out",
+            str(out_dir),
+            "--profile",
+            "--profile-dump",
+            str(tmp_path / "import.prof"),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    log = json.loads((out_dir / "import_log.json").read_text())
+    profile = log["profile"]
+    assert profile["rules"] == {"groceries": 1, "salary": 1}
+    assert profile["dedupe"] == {"dropped": 0}
+    [stages] = profile["files"].values()
+    assert [s["stage"] for s in stages] == ["parse", "apply_rules"]
+    assert stages[0]["rows_out"] == 2
+    assert (tmp_path / "import.prof").exists()
+
+
+def test_preview_reads_only_n_rows(tmp_path: Path) -> None:
+    csv = tmp_path / "bank.csv"
+    csv.write_text(
+        "date,description,amount\n"
+        "2024-01-01,CARREFOUR,-1.00\n"
+        "2024-01-02,MONOPRIX,-2.00\n"
+        "not a date,BROKEN,oops\n"
+    )
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "preview",
+            str(csv),
+            "--rules",
+            str(BASE / "samples/rules.yml"),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--n",
+            "2",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "MONOPRIX" in result.output
+    assert "BROKEN" not in result.output
+
+
+def test_light_report_shards(tmp_path):
+    import gzip
+
+    from ledgerize.report import build_light_report
+
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2020-01-01", periods=2000, freq="D"),
+            "account": "A",
+            "description": "x",
+            "category": [f"cat{i % 40}" for i in range(2000)],
+            "amount": 1.0,
+            "currency": "EUR",
+        }
+    )
+    out = tmp_path / "report.html"
+    size = build_light_report(df, out, budget=8_000)
+    assert size == len(out.read_bytes()) and size <= 8_000
+    assert '"Other"' in out.read_text()
+    shards = sorted((tmp_path / "report_shards").glob("*.json.gz"))
+    assert len(shards) == 66
+    shard = json.loads(gzip.decompress(shards[0].read_bytes()))
+    assert shard["rows"][0][:2] == ["2020-01-01", "A"] and len(shard["rows"]) == 31
+
+    # A shorter report replaces the shards of the previous one.
+    build_light_report(df, out, budget=8_000, months=3)
+    shards = sorted((tmp_path / "report_shards").glob("*.json.gz"))
+    assert [s.name for s in shards] == [
+        "2025-04.json.gz",
+        "2025-05.json.gz",
+        "2025-06.json.gz",
+    ]
+
+
+def test_pipelined_import_matches_sequential(tmp_path: Path) -> None:
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    sample = (BASE / "samples/n26_2025-06.csv").read_text()
+    # The same statement twice: duplicates span batches.
+    (inbox / "n26_a.csv").write_text(sample)
+    (inbox / "n26_b.csv").write_text(sample)
+    runner = CliRunner()
+    outputs = {}
+    for mode in ([], ["--pipeline", "--queue-size", "1"]):
+        out_dir = tmp_path / ("pipe" if mode else "seq")
+        result = runner.invoke(
+            main,
+            [
+                "import",
+                str(inbox),
+                "--rules",
+                str(BASE / "samples/rules.yml"),
+                "--accounts",
+                str(BASE / "samples/accounts.yml"),
+                "--out",
+                str(out_dir),
+                *mode,
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        outputs[bool(mode)] = out_dir
+    seq, pipe = outputs[False], outputs[True]
+    query = "SELECT * FROM transactions ORDER BY id"
+    seq_rows = pd.read_sql_query(query, f"sqlite:///{seq / 'ledgerize.db'}")
+    pipe_rows = pd.read_sql_query(query, f"sqlite:///{pipe / 'ledgerize.db'}")
+    pd.testing.assert_frame_equal(seq_rows, pipe_rows)
+    assert len(pipe_rows) == len(sample.splitlines()) - 1
+    for name in ["normalized.csv", "normalized.jsonl"]:
+        assert (pipe / name).read_text() == (seq / name).read_text()
+    seq_log = json.loads((seq / "import_log.json").read_text())
+    assert json.loads((pipe / "import_log.json").read_text()) == seq_log
+
+
+def test_report_light_months(tmp_path: Path) -> None:
+    from ledgerize.db import Database
+
+    df = pd.DataFrame(
+        {
+            "id": [f"t{i}" for i in range(800)],
+            "date": pd.date_range("2022-01-01", periods=800, freq="D").strftime(
+                "%Y-%m-%d"
+            ),
+            "account": "A",
+            "description": [f"x{i}" for i in range(800)],
+            "norm_desc": [f"x{i}" for i in range(800)],
+            "category": "Misc",
+            "amount": 1.0,
+            "currency": "EUR",
+        }
+    )
+    db = Database(tmp_path / "ledgerize.db")
+    db.ingest_dataframe(df)
+    html = tmp_path / "report.html"
+    result = CliRunner().invoke(
+        main,
+        ["report", "--db", str(db.path), "--html", str(html), "--light"]
+        + ["--months", "3"],
+    )
+    assert result.exit_code == 0, result.output
+    shards = sorted(p.name for p in (tmp_path / "report_shards").glob("*.json.gz"))
+    assert shards == ["2024-01.json.gz", "2024-02.json.gz", "2024-03.json.gz"]
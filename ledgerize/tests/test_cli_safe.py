@@ -3,6 +3,7 @@ import shutil
 
 import pytest
 
+from app import cli_safe
 from app.cli_safe import list_subcommands, ensure_subcommand, run_cli
 
 CLICK_HELP = """Usage: prog [OPTIONS] COMMAND [ARGS]...
@@ -76,3 +77,89 @@ def test_integration_ledgerize():
     cmds = list_subcommands("ledgerize")
     assert cmds
     ensure_subcommand("ledgerize", "import")
+
+
+def test_subcommand_cache(monkeypatch, tmp_path):
+    binary = tmp_path / "prog"
+    binary.write_text("#!/bin/sh\n")
+    binary.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    monkeypatch.setenv("APP_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(cli_safe, "_MEMO", {})
+    calls = []
+
+    def fake_help(name):
+        calls.append(name)
+        return CLICK_HELP
+
+    monkeypatch.setattr(cli_safe, "_run_help", fake_help)
+    expected = {"import", "report", "preview"}
+    assert list_subcommands("prog") == expected
+    assert list_subcommands("prog") == expected
+    assert len(calls) == 1
+
+    # A new process only reads the on-disk cache.
+    cli_safe._MEMO.clear()
+    assert list_subcommands("prog") == expected
+    assert len(calls) == 1
+
+    # Changing the binary invalidates the entry.
+    binary.write_text("#!/bin/sh\n# v2\n")
+    assert list_subcommands("prog") == expected
+    assert len(calls) == 2
+
+    cli_safe.refresh_cache()
+    assert calls[-1] == str(binary)
+
+
+def test_batch_runs_manifest(tmp_path, monkeypatch):
+    import json
+    import sys
+
+    from app import main as app_main
+
+    monkeypatch.setattr(cli_safe, "list_subcommands", lambda binary: {"-c"})
+    manifest = tmp_path / "batch.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                [sys.executable, "-c", "print('ok')"],
+                {"cmd": [sys.executable, "-c", "import sys; sys.exit(3)"]},
+                {
+                    "cmd": [sys.executable, "-c", "import time; time.sleep(5)"],
+                    "timeout": 0.5,
+                },
+                [sys.executable, "-x"],
+            ]
+        )
+    )
+    out = tmp_path / "report.json"
+    with pytest.raises(SystemExit):
+        app_main.main(["--batch", str(manifest), "--jobs", "2", "--output", str(out)])
+    report = json.loads(out.read_text())
+    assert (report["total"], report["succeeded"], report["failed"]) == (4, 1, 3)
+    ok, failed, slow, invalid = report["results"]
+    assert ok["stdout"].strip() == "ok" and ok["attempts"] == 1
+    assert failed["returncode"] == 3
+    assert slow["timed_out"] and slow["duration_s"] < 5
+    assert invalid["returncode"] is None and "Commande inconnue" in invalid["error"]
+
+
+def test_run_cli_streaming(monkeypatch, capsys):
+    import sys
+
+    monkeypatch.setattr(cli_safe, "list_subcommands", lambda binary: {"-c"})
+    code = "for i in range(500): print(i)"
+    cp = run_cli(sys.executable, ["-c", code], stream=True, timeout=None, tail_lines=3)
+    assert capsys.readouterr().out.splitlines()[-1] == "499"
+    assert cp.stdout == "497\n498\n499\n"
+
+    with pytest.raises(RuntimeError, match="failed with code 2"):
+        run_cli(sys.executable, ["-c", "import sys; sys.exit(2)"], stream=True)
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_cli(
+            sys.executable,
+            ["-c", "import time; time.sleep(5)"],
+            stream=True,
+            timeout=0.3,
+        )
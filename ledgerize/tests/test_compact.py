@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import pandas as pd
+
+from ledgerize.compact import compact_frame, is_compact
+from ledgerize.config import load_accounts, load_rules
+from ledgerize.dedupe import dedupe
+from ledgerize.parsers import parse_file
+from ledgerize.rules import apply_rules
+
+BASE = Path(__file__).resolve().parent.parent
+
+
+def _pipeline(compact: bool) -> pd.DataFrame:
+    accounts = load_accounts(BASE / "samples/accounts.yml")
+    rules = load_rules(BASE / "samples/rules.yml")
+    df = parse_file(BASE / "samples/n26_2025-06.csv", accounts, "EUR", compact=compact)
+    return dedupe(apply_rules(df, rules))
+
+
+def test_compact_pipeline_matches_default() -> None:
+    plain = _pipeline(compact=False)
+    compact = _pipeline(compact=True)
+    assert is_compact(compact)
+    assert isinstance(compact["rule_id"].dtype, pd.CategoricalDtype)
+    assert compact["id"].dtype != object
+    pd.testing.assert_frame_equal(
+        compact.astype(object).where(compact.notna(), None),
+        plain.astype(object).where(plain.notna(), None),
+    )
+
+
+def test_compact_frame_is_idempotent() -> None:
+    df = pd.DataFrame({"account": ["A", "A"], "id": ["x", "y"], "amount": [1.0, 2.0]})
+    once = compact_frame(df)
+    assert compact_frame(once).dtypes.equals(once.dtypes)
@@ -0,0 +1,90 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from ledgerize.config import load_base_currency
+from ledgerize.fx import convert, load_rates
+from ledgerize.report import _prepare
+
+
+def test_convert_uses_latest_rate_per_currency(tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text(
+        "date,currency,rate\n"
+        "2024-01-01,USD,0.90\n"
+        "2024-01-10,USD,0.80\n"
+        "2024-01-05,GBP,1.20\n"
+    )
+    rates = load_rates(path)
+    assert load_rates(path) is rates
+    df = pd.DataFrame(
+        {
+            "date": [
+                date(2024, 1, 12),
+                date(2024, 1, 3),
+                date(2024, 1, 3),
+                date(2024, 1, 6),
+                date(2024, 1, 6),
+            ],
+            "amount": [10.0, 10.0, 10.0, 10.0, 10.0],
+            "currency": ["USD", "USD", "GBP", "GBP", "EUR"],
+        }
+    )
+    out = convert(df, rates, "EUR")
+    expected = [8.0, 9.0, np.nan, 12.0, 10.0]
+    np.testing.assert_allclose(out["amount_base"], expected)
+    assert "amount_base" not in df
+
+
+def test_convert_ignores_currency_case(tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text("date,currency,rate\n2024-01-01,USD,0.5\n")
+    df = pd.DataFrame(
+        {
+            "date": [date(2024, 1, 2)] * 2,
+            "amount": [10.0, 4.0],
+            "currency": ["usd", "eur"],
+        }
+    )
+    out = convert(df, load_rates(path), "EUR")
+    np.testing.assert_allclose(out["amount_base"], [5.0, 4.0])
+
+
+def test_report_falls_back_to_amount_in_base_currency(caplog):
+    df = pd.DataFrame(
+        {
+            "date": [date(2024, 1, 2)] * 4,
+            "amount": [10.0, 4.0, 3.0, 7.0],
+            "currency": ["USD", "EUR", "EUR", "GBP"],
+            # The EUR row with NaN was imported before --fx-rates; GBP has no rate.
+            "amount_base": [5.0, 4.0, np.nan, np.nan],
+        }
+    )
+    prepared, value = _prepare(df)
+    assert value == "amount_base"
+    np.testing.assert_allclose(prepared[value], [5.0, 4.0, 3.0, np.nan])
+    assert "1 rows without an FX rate to EUR" in caplog.text
+    assert "guessed EUR from the data" in caplog.text
+
+
+def test_report_uses_configured_base_currency(tmp_path, caplog):
+    df = pd.DataFrame(
+        {
+            "date": [date(2024, 1, 2)] * 3,
+            "amount": [10.0, 4.0, 3.0],
+            "currency": ["USD", "EUR", "EUR"],
+            # USD happened to trade at 1.0: the data alone cannot tell the base.
+            "amount_base": [10.0, 4.0, np.nan],
+        }
+    )
+    prepared, _ = _prepare(df.copy())
+    assert np.isnan(prepared["amount_base"].iloc[2])
+    assert "guessed none" in caplog.text
+
+    accounts = tmp_path / "accounts.yml"
+    accounts.write_text("base_currency: eur\naccounts: []\n")
+    caplog.clear()
+    prepared, _ = _prepare(df.copy(), load_base_currency(accounts))
+    np.testing.assert_allclose(prepared["amount_base"], [10.0, 4.0, 3.0])
+    assert "guessed" not in caplog.text
@@ -0,0 +1,138 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+from click.testing import CliRunner
+
+from ledgerize.cli import main
+from ledgerize.db import Database, open_database
+from ledgerize.parquet_db import ParquetDatabase
+
+BASE = Path(__file__).resolve().parent.parent
+
+
+def test_import_parquet_backend(tmp_path):
+    out = tmp_path / "out"
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "import",
+            str(BASE / "samples"),
+            "--rules",
+            str(BASE / "samples/rules.yml"),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--out",
+            str(out),
+            "--backend",
+            "parquet",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    dataset = out / "ledgerize.parquet"
+    assert not (out / "ledgerize.db").exists()
+    # parse_date is dayfirst, so the June sample's 2025-06-01 and 2025-06-05
+    # are stored as January 6 and May 6; the partitions follow the parsed dates.
+    assert sorted(
+        p.parent.relative_to(dataset).as_posix() for p in dataset.rglob("*.parquet")
+    ) == [
+        "account=N26-XXXX/year=2025/month=1",
+        "account=N26-XXXX/year=2025/month=5",
+    ]
+
+    db = open_database(dataset)
+    assert isinstance(db, ParquetDatabase)
+    assert db.rules_snapshot()["default_category"] == "Uncategorized"
+    assert db.find_transaction("salary")["category"] == "Income"
+    assert [r["category"] for r in db.query_transactions(since="2025-05-01")] == [
+        "Income"
+    ]
+    totals = db.monthly_totals(months=1)
+    assert [(r["month"], r["amount"], r["count"]) for r in totals] == [
+        ("2025-05", 2000.0, 1)
+    ]
+
+    result = runner.invoke(main, ["explain", "--db", str(dataset), "CARREFOUR"])
+    assert json.loads(result.output)["rule"] == "groceries"
+    html = tmp_path / "report.html"
+    result = runner.invoke(main, ["report", "--db", str(dataset), "--html", str(html)])
+    assert result.exit_code == 0, result.output
+    assert html.exists()
+
+
+def test_parquet_append_only(tmp_path):
+    db = ParquetDatabase(tmp_path / "data.parquet")
+    frame = pd.DataFrame(
+        {
+            "id": ["a"],
+            "account": ["A"],
+            "date": [pd.Timestamp("2024-03-02").date()],
+            "amount": [1.0],
+            "currency": ["EUR"],
+            "description": ["x"],
+            "norm_desc": ["X"],
+            "category": ["C"],
+        }
+    )
+    assert db.ingest_dataframe(frame) == 1
+    first = set((tmp_path / "data.parquet").rglob("*.parquet"))
+    db.ingest_dataframe(frame.assign(id="b"))
+    files = set((tmp_path / "data.parquet").rglob("*.parquet"))
+    assert first < files and len(files) == 2
+    assert db.existing_ids(["a", "b", "c"]) == {"a", "b"}
+    assert len(db.read_all()) == 2
+
+
+def test_parquet_schema_evolution(tmp_path):
+    db = ParquetDatabase(tmp_path / "data.parquet")
+    frame = pd.DataFrame(
+        {
+            "id": ["a"],
+            "account": ["A"],
+            "date": [pd.Timestamp("2024-03-02").date()],
+            "amount": [1.0],
+            "currency": ["EUR"],
+            "description": ["x"],
+            "norm_desc": ["X"],
+            "category": ["C"],
+            "rule_id": [None],
+        }
+    )
+    db.ingest_dataframe(frame)
+    # A later import fills rule_id and adds balance and amount_base; its
+    # partition sorts after the first one, so discovery sees the old file first.
+    db.ingest_dataframe(
+        frame.assign(id="b", account="B", rule_id="r1", balance=5.0, amount_base=2.0)
+    )
+    df = db.read_all().set_index("id")
+    assert df.loc["b", "rule_id"] == "r1" and pd.isna(df.loc["a", "rule_id"])
+    assert df.loc["b", "balance"] == 5.0 and pd.isna(df.loc["a", "balance"])
+    totals = db.monthly_totals()
+    assert [(r["account"], r["amount"]) for r in totals] == [("A", 1.0), ("B", 1.0)]
+    assert pd.isna(totals[0]["amount_base"]) and totals[1]["amount_base"] == 2.0
+
+
+def test_read_transactions_months_match_across_backends(tmp_path):
+    # Months 2024-01, 2024-02, 2024-04 and 2024-05 are stored; March is empty.
+    days = ["2024-01-15", "2024-02-03", "2024-02-20", "2024-04-01", "2024-05-31"]
+    frame = pd.DataFrame(
+        {
+            "id": [f"t{i}" for i in range(len(days))],
+            "account": "A",
+            "date": [pd.Timestamp(d).date() for d in days],
+            "amount": 1.0,
+            "currency": "EUR",
+            "description": days,
+            "norm_desc": days,
+            "category": "C",
+        }
+    )
+    sqlite = Database(tmp_path / "ledgerize.db")
+    parquet = ParquetDatabase(tmp_path / "ledgerize.parquet")
+    for db in (sqlite, parquet):
+        db.ingest_dataframe(frame)
+    for months, expected in ((3, days[1:]), (12, days)):
+        for db in (sqlite, parquet):
+            got = db.read_transactions(months)["date"].dt.strftime("%Y-%m-%d")
+            assert sorted(got) == expected
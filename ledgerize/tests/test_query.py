@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sqlalchemy import inspect
+
+from ledgerize.db import INDEXES, Database
+from ledgerize.query import Filters, fetch_page, iter_frames, iter_records
+
+
+def _db(tmp_path: Path) -> Database:
+    rows = [
+        {
+            "id": f"t{i:03d}",
+            "account": "A" if i % 3 else "B",
+            # Several rows per day so the id breaks ties between pages.
+            "date": date(2024, 1, 1) + timedelta(days=i // 4),
+            "amount": float(i - 20),
+            "currency": "EUR",
+            "description": "SHOP 50% OFF" if i % 5 == 0 else f"PAYEE {i}",
+            "norm_desc": f"PAYEE {i}",
+            "category": "Groceries" if i % 2 else "Other",
+        }
+        for i in range(40)
+    ]
+    db = Database(tmp_path / "ledgerize.db")
+    db.ingest_dataframe(pd.DataFrame(rows))
+    return db
+
+
+def test_iter_frames_filters_and_pages(tmp_path: Path) -> None:
+    db = _db(tmp_path)
+    # Created at ingest time; queries only read.
+    assert set(INDEXES) <= {
+        i["name"] for i in inspect(db.engine).get_indexes("transactions")
+    }
+    filters = Filters(
+        since="2024-01-02",
+        until=date(2024, 1, 8),
+        account=["A"],
+        category="Groceries",
+        min_amount=-15,
+        max_amount=10,
+    )
+    frames = list(iter_frames(db.path, filters, chunk_size=3))
+    assert {len(f) for f in frames[:-1]} == {3}
+    got = pd.concat(frames, ignore_index=True)
+    df = db.read_all()
+    expected = df[
+        (df["date"] >= "2024-01-02")
+        & (df["date"] <= "2024-01-08")
+        & (df["account"] == "A")
+        & (df["category"] == "Groceries")
+        & df["amount"].between(-15, 10)
+    ].sort_values(["date", "id"], ignore_index=True)
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_records_text_and_columns(tmp_path: Path) -> None:
+    db = _db(tmp_path)
+    records = list(
+        iter_records(db, Filters(text="50%"), columns=["amount"], chunk_size=2)
+    )
+    assert [r.id for r in records] == [f"t{i:03d}" for i in range(0, 40, 5)]
+    assert records[0]._fields == ("date", "id", "amount")
+    assert list(iter_records(db, Filters(text="5_%"))) == []
+    with pytest.raises(ValueError):
+        list(iter_records(db, columns=["nope"]))
+
+
+def test_fetch_page_cursor(tmp_path: Path) -> None:
+    db = _db(tmp_path)
+    seen, cursor = [], None
+    while True:
+        page = fetch_page(db, limit=7, after=cursor)
+        seen += [r["id"] for r in page.rows]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert seen == sorted(seen) == [f"t{i:03d}" for i in range(40)]
+    assert fetch_page(db, Filters(account="C")) == ([], None)
@@ -0,0 +1,192 @@
+import json
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+import yaml
+from click.testing import CliRunner
+
+from ledgerize.cli import main
+from ledgerize.config import load_rules
+from ledgerize.db import Database
+from ledgerize.recategorize import changed_rules, recategorize
+
+BASE = Path(__file__).resolve().parent.parent
+
+
+def _import(out: Path) -> Path:
+    result = CliRunner().invoke(
+        main,
+        [
+            "import",
+            str(BASE / "samples"),
+            "--rules",
+            str(BASE / "samples/rules.yml"),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--out",
+            str(out),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    return out / "ledgerize.db"
+
+
+def test_changed_rules():
+    old = load_rules(BASE / "samples/rules.yml")
+    assert changed_rules(old, old) == []
+    new = json.loads(json.dumps(old))
+    new["rules"][1]["set"]["category"] = "Salary"
+    assert [r["id"] for r in changed_rules(old, new)] == ["salary", "salary"]
+    reordered = {**old, "rules": old["rules"][::-1]}
+    assert changed_rules(old, reordered) is None
+
+
+def test_recategorize_updates_changed_rows(tmp_path):
+    db = _import(tmp_path / "out")
+    cfg = load_rules(BASE / "samples/rules.yml")
+    cfg["rules"][1]["set"]["category"] = "Salary"
+    rules = tmp_path / "rules.yml"
+    rules.write_text(yaml.safe_dump(cfg))
+
+    result = CliRunner().invoke(
+        main, ["recategorize", "--db", str(db), "--rules", str(rules)]
+    )
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.output)
+    assert summary["mode"] == "incremental"
+    assert (summary["evaluated"], summary["updated"]) == (1, 1)
+
+    conn = sqlite3.connect(db)
+    rows = dict(conn.execute("SELECT rule_id, category FROM transactions"))
+    assert rows == {"groceries": "Groceries", "salary": "Salary"}
+    totals = {r[0] for r in conn.execute("SELECT category FROM monthly_totals")}
+    assert "Salary" in totals and "Income" not in totals
+
+    # The snapshot now matches, so a second run has nothing to do.
+    result = CliRunner().invoke(
+        main, ["recategorize", "--db", str(db), "--rules", str(rules)]
+    )
+    assert json.loads(result.output)["scanned"] == 0
+
+
+def test_merge_with_other_rules_marks_snapshot_stale(tmp_path):
+    db = _import(tmp_path / "out")
+    cfg = load_rules(BASE / "samples/rules.yml")
+    cfg["rules"][1]["set"]["category"] = "Salary"
+    rules = tmp_path / "rules.yml"
+    rules.write_text(yaml.safe_dump(cfg))
+    result = CliRunner().invoke(
+        main,
+        [
+            "import",
+            str(BASE / "samples"),
+            "--rules",
+            str(rules),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--out",
+            str(tmp_path / "out"),
+            "--merge",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert Database(db).rules_snapshot() is None
+
+    result = CliRunner().invoke(
+        main, ["recategorize", "--db", str(db), "--rules", str(rules)]
+    )
+    assert json.loads(result.output)["mode"] == "full"
+    assert Database(db).rules_snapshot() == cfg
+
+
+def test_recategorize_keeps_parser_values(tmp_path):
+    frame = pd.DataFrame(
+        {
+            "id": ["s", "p"],
+            "account": ["A", "A"],
+            "date": ["2024-01-01", "2024-01-02"],
+            "amount": [-5.0, -7.0],
+            "currency": ["EUR", "EUR"],
+            "description": ["SHOP", "PAYEE"],
+            "norm_desc": ["SHOP", "PAYEE"],
+            # "Shop Inc" was set by the old rule, "Bob" by the parser.
+            "counterparty": ["Shop Inc", "Bob"],
+            "category": ["Shopping", "Other"],
+            "rule_id": ["shop", None],
+        }
+    )
+    db = Database(tmp_path / "ledgerize.db")
+    db.ingest_dataframe(frame)
+    old = {
+        "default_category": "Other",
+        "rules": [
+            {
+                "id": "shop",
+                "when": {"contains": "SHOP"},
+                "set": {"category": "Shopping", "counterparty": "Shop Inc"},
+            }
+        ],
+    }
+
+    def stored():
+        df = db.read_all().set_index("id")
+        return df[["category", "counterparty"]].to_dict("index")
+
+    new = json.loads(json.dumps(old))
+    new["rules"][0]["set"]["counterparty"] = "Shop Ltd"
+    recategorize(db, new, None)
+    assert stored() == {
+        "s": {"category": "Shopping", "counterparty": "Shop Ltd"},
+        "p": {"category": "Other", "counterparty": "Bob"},
+    }
+
+    # The rule no longer matches: its value is cleared, the parser's is kept.
+    gone = json.loads(json.dumps(new))
+    gone["rules"][0]["when"] = {"contains": "NOTHING"}
+    summary = recategorize(db, gone, new)
+    assert summary["mode"] == "incremental"
+    assert stored() == {
+        "s": {"category": "Other", "counterparty": None},
+        "p": {"category": "Other", "counterparty": "Bob"},
+    }
+
+
+def test_recategorize_leaves_transfers_alone(tmp_path):
+    from ledgerize.transfers import detect_transfers
+
+    frame = pd.DataFrame(
+        {
+            "id": ["out", "in", "shop"],
+            "account": ["Checking", "Savings", "Checking"],
+            "date": ["2024-01-01", "2024-01-01", "2024-01-03"],
+            "amount": [-100.0, 100.0, -5.0],
+            "currency": ["EUR"] * 3,
+            "description": ["VIR SAVINGS", "VIR CHECKING", "SHOP"],
+            "norm_desc": ["VIR SAVINGS", "VIR CHECKING", "SHOP"],
+            "category": ["Other"] * 3,
+            "rule_id": [None] * 3,
+        }
+    )
+    db = Database(tmp_path / "ledgerize.db")
+    db.ingest_dataframe(detect_transfers(frame, window=3))
+    old = {"default_category": "Other", "rules": []}
+    new = {
+        "default_category": "Other",
+        "rules": [
+            {"id": "vir", "when": {"contains": "VIR"}, "set": {"category": "Bank"}},
+            {"id": "shop", "when": {"contains": "SHOP"}, "set": {"category": "Shop"}},
+        ],
+    }
+
+    def stored():
+        df = db.read_all().set_index("id")
+        return df[["category", "rule_id"]].to_dict("index")
+
+    for previous in (None, old):
+        recategorize(db, new, previous)
+        assert stored() == {
+            "out": {"category": "Transfer", "rule_id": "transfer"},
+            "in": {"category": "Transfer", "rule_id": "transfer"},
+            "shop": {"category": "Shop", "rule_id": "shop"},
+        }
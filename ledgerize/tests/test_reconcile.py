@@ -0,0 +1,127 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+from click.testing import CliRunner
+
+from ledgerize.cli import main
+from ledgerize.reconcile import condense, reconcile, summarize
+
+BASE = Path(__file__).resolve().parent.parent
+
+
+def test_reconcile_flags_mismatch_gap_and_overlap():
+    df = pd.DataFrame(
+        {
+            "account": ["A"] * 6 + ["B"],
+            "date": [
+                date(2024, 1, 2),
+                date(2024, 1, 5),
+                date(2024, 1, 9),
+                date(2024, 3, 1),
+                date(2024, 3, 4),
+                date(2024, 1, 7),
+                date(2024, 1, 1),
+            ],
+            "amount": [-10.0, -5.0, 100.0, -20.0, -1.0, 3.0, 1.0],
+            "balance": [90.0, 85.0, 180.0, 150.0, 149.0, None, 1.0],
+            "raw_source": ["jan.csv"] * 3 + ["mar.csv"] * 2 + ["extra.csv", "b.csv"],
+        }
+    )
+    issues = reconcile(df)
+    assert summarize(issues) == {
+        "mismatch": 1,
+        "gap": 1,
+        "overlap": 1,
+        "missing_month": 1,
+    }
+    by_kind = issues.set_index("kind")
+    assert by_kind.loc["mismatch", "delta"] == -8.0
+    assert by_kind.loc["gap", "source"] == "mar.csv"
+    assert by_kind.loc["overlap", "source"] == "extra.csv"
+    assert by_kind.loc["missing_month", "start"] == date(2024, 2, 1)
+
+
+def test_condensed_batches_reconcile_like_full_rows():
+    df = pd.DataFrame(
+        {
+            "account": ["A"] * 8,
+            "date": [date(2024, 1, 2)] * 3
+            + [date(2024, 1, 3)] * 2
+            + [date(2024, 3, 1)] * 3,
+            "amount": [-1.0, -2.0, -3.0, 10.0, -4.0, -5.0, -6.0, -7.0],
+            "balance": [None, None, 94.0, None, 100.0, None, None, 80.0],
+            "raw_source": ["jan.csv"] * 5 + ["mar.csv"] * 3,
+        }
+    )
+    batches = [condense(df.iloc[:4]), condense(df.iloc[4:])]
+    # Runs without a balance collapse: 8 rows become 6.
+    assert sum(len(b) for b in batches) == 6
+    condensed = reconcile(pd.concat(batches, ignore_index=True))
+    pd.testing.assert_frame_equal(condensed, reconcile(df))
+    assert summarize(condensed)["gap"] == 1
+
+
+def test_reconcile_cli_and_import_log(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "n26_2025.csv").write_text(
+        "Date;Payee;Account;Amount;Currency;Balance\n"
+        "2025-01-02;CARREFOUR;DE123;-42.50;EUR;957.50\n"
+        "2025-01-03;SALARY;DE123;2000.00;EUR;2957.50\n"
+        "2025-01-04;MONOPRIX;DE123;-10.00;EUR;2900.00\n"
+    )
+    out = tmp_path / "out"
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "import",
+            str(data),
+            "--rules",
+            str(BASE / "samples/rules.yml"),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--out",
+            str(out),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    log = json.loads((out / "import_log.json").read_text())
+    assert log["reconcile"]["mismatch"] == 1
+
+    result = runner.invoke(
+        main, ["reconcile", "--db", str(out / "ledgerize.db"), "--json"]
+    )
+    assert result.exit_code == 1
+    payload = json.loads(result.output)
+    assert payload["issues"][0]["delta"] == -47.5
+
+
+def test_import_reconciles_deduplicated_rows(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    sample = (BASE / "samples/n26_2025-06.csv").read_text()
+    # The same statement downloaded twice is deduplicated, not an overlap.
+    (data / "n26_a.csv").write_text(sample)
+    (data / "n26_b.csv").write_text(sample)
+    for flags in ([], ["--pipeline"]):
+        out = tmp_path / f"out{len(flags)}"
+        result = CliRunner().invoke(
+            main,
+            [
+                "import",
+                str(data),
+                "--rules",
+                str(BASE / "samples/rules.yml"),
+                "--accounts",
+                str(BASE / "samples/accounts.yml"),
+                "--out",
+                str(out),
+                *flags,
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        log = json.loads((out / "import_log.json").read_text())
+        assert log["reconcile"]["overlap"] == 0
@@ -0,0 +1,79 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pandas as pd
+
+from ledgerize.db import Database
+from ledgerize.recurring import detect_recurring
+
+
+def _rows(desc, account, start, step, count, amount):
+    return [
+        {
+            "id": f"{desc}-{account}-{i}",
+            "account": account,
+            "date": start + timedelta(days=step * i),
+            "amount": amount,
+            "currency": "EUR",
+            "description": desc,
+            "norm_desc": desc,
+            "category": "C",
+        }
+        for i in range(count)
+    ]
+
+
+def _frame():
+    rows = (
+        _rows("NETFLIX", "A", date(2024, 1, 3), 30, 6, -12.99)
+        + _rows("GYM", "A", date(2024, 1, 1), 7, 5, -10.0)
+        + _rows("INSURANCE", "B", date(2020, 3, 1), 365, 4, -300.0)
+        + _rows("SHOP", "A", date(2024, 1, 1), 30, 2, -5.0)
+        + _rows("SHOP", "A", date(2024, 3, 4), 3, 3, -50.0)
+    )
+    return pd.DataFrame(rows)
+
+
+def test_detect_recurring_periods():
+    found = detect_recurring(_frame()).set_index("norm_desc")
+    assert found["period"].to_dict() == {
+        "GYM": "weekly",
+        "INSURANCE": "yearly",
+        "NETFLIX": "monthly",
+    }
+    assert found.loc["NETFLIX", "count"] == 6
+    assert found.loc["GYM", "next_date"] == date(2024, 2, 5)
+
+
+def test_recurring_table_refreshed_incrementally(tmp_path):
+    path = tmp_path / "ledgerize.db"
+    db = Database(path)
+    frame = _frame()
+    # The first ingest creates the table without a full read_recurring.
+    db.ingest_dataframe(frame[frame["norm_desc"] == "SHOP"])
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM recurring").fetchone() == (0,)
+
+    db.ingest_dataframe(frame[~frame["norm_desc"].isin(["GYM", "SHOP"])])
+    rows = dict(conn.execute("SELECT norm_desc, count FROM recurring"))
+    assert rows == {"NETFLIX": 6, "INSURANCE": 4}
+
+    db.ingest_dataframe(frame[frame["norm_desc"] == "GYM"])
+    rows = dict(conn.execute("SELECT norm_desc, count FROM recurring"))
+    assert rows == {"NETFLIX": 6, "INSURANCE": 4, "GYM": 5}
+    assert set(db.read_recurring()["norm_desc"]) == {"NETFLIX", "INSURANCE", "GYM"}
+
+
+def test_recurring_table_built_for_existing_ledger(tmp_path):
+    path = tmp_path / "ledgerize.db"
+    db = Database(path)
+    frame = _frame()
+    db.ingest_dataframe(frame[frame["norm_desc"] != "GYM"])
+    with db.engine.begin() as conn:
+        # A ledger written before the recurring table was introduced.
+        conn.exec_driver_sql("DROP TABLE recurring")
+
+    db.ingest_dataframe(frame[frame["norm_desc"] == "GYM"])
+    conn = sqlite3.connect(path)
+    rows = dict(conn.execute("SELECT norm_desc, count FROM recurring"))
+    assert rows == {"NETFLIX": 6, "INSURANCE": 4, "GYM": 5}
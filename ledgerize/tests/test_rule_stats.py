@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+from click.testing import CliRunner
+
+from ledgerize.cli import main
+from ledgerize.rule_stats import backtracking_risks, rule_stats
+
+BASE = Path(__file__).resolve().parent.parent
+
+
+def test_rule_stats_statuses():
+    df = pd.DataFrame(
+        {
+            "description": ["CARREFOUR CITY", "MONOPRIX", "SALARY"],
+            "amount": [-10.0, -5.0, 2000.0],
+        }
+    )
+    cfg = {
+        "rules": [
+            {"id": "shops", "when": {"regex": "(?i)CARREFOUR|MONOPRIX"}},
+            {"id": "carrefour", "when": {"contains": "carrefour"}},
+            {"id": "never", "when": {"regex": "NOPE"}},
+            {"id": "all_shops", "when": {"amount_lt": 0}},
+        ]
+    }
+    stats = {s.id: s for s in rule_stats(df, cfg)}
+    assert (stats["shops"].matches, stats["shops"].overridden) == (2, 2)
+    assert stats["shops"].status == "shadowed"
+    assert stats["carrefour"].status == "shadowed"
+    assert stats["never"].status == "dead"
+    assert (stats["all_shops"].effective, stats["all_shops"].status) == (2, "ok")
+
+
+def test_backtracking_risks():
+    assert backtracking_risks("(?i)CARREFOUR|MONOPRIX") == []
+    assert backtracking_risks("^(a+)+$") == ["nested quantifier"]
+    assert backtracking_risks(r"(x|\wy)*z") == [
+        "overlapping alternation inside a quantifier"
+    ]
+    assert backtracking_risks("(")[0].startswith("invalid regex")
+
+
+def test_rules_stats_cli():
+    result = CliRunner().invoke(
+        main,
+        [
+            "rules",
+            "stats",
+            str(BASE / "samples"),
+            "--rules",
+            str(BASE / "samples/rules.yml"),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--json",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output)
+    assert [r["matches"] for r in data["rules"]] == [1, 1]
@@ -33,3 +33,42 @@ def test_secure_import(tmp_path: Path, monkeypatch) -> None:
     vault_file = vault_dir / "data.lzvault"
     assert vault_file.exists()
     assert not (out_dir / "ledgerize.db").exists()
+
+
+def test_report_and_explain_from_vault(tmp_path: Path, monkeypatch) -> None:
+    key = os.urandom(32)
+    monkeypatch.setattr(vault, "_load_key", lambda: key)
+    runner = CliRunner()
+    out_dir = tmp_path / "data"
+    result = runner.invoke(
+        main,
+        [
+            "import",
+            str(BASE / "samples"),
+            "--rules",
+            str(BASE / "samples/rules.yml"),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--out",
+            str(out_dir),
+        ],
+    )
+    assert result.exit_code == 0
+    vault_file = tmp_path / "bank.lzvault"
+    vault.lock(out_dir, vault_file)
+    for p in out_dir.iterdir():
+        p.unlink()
+    html = tmp_path / "report" / "index.html"
+    result = runner.invoke(
+        main, ["report", "--vault", str(vault_file), "--html", str(html)]
+    )
+    assert result.exit_code == 0, result.output
+    assert html.exists()
+    result = runner.invoke(
+        main, ["explain", "--from-vault", str(vault_file), "CARREFOUR"]
+    )
+    assert "groceries" in result.output
+    files = {p.relative_to(tmp_path) for p in tmp_path.rglob("*") if p.is_file()}
+    assert files == {Path("bank.lzvault"), Path("report/index.html")}
+    result = runner.invoke(main, ["explain", "CARREFOUR"])
+    assert result.exit_code != 0
@@ -0,0 +1,106 @@
+import http.client
+import json
+import threading
+from pathlib import Path
+
+import pandas as pd
+from click.testing import CliRunner
+
+from ledgerize.cli import main
+from ledgerize.client import query_server
+from ledgerize.db import Database
+from ledgerize.server import LedgerServer, advertise
+
+BASE = Path(__file__).resolve().parent.parent
+
+
+def _import(out_dir: Path) -> Path:
+    result = CliRunner().invoke(
+        main,
+        [
+            "import",
+            str(BASE / "samples"),
+            "--rules",
+            str(BASE / "samples/rules.yml"),
+            "--accounts",
+            str(BASE / "samples/accounts.yml"),
+            "--out",
+            str(out_dir),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    return out_dir / "ledgerize.db"
+
+
+def test_serve_answers_cli_queries(tmp_path: Path) -> None:
+    db = _import(tmp_path / "data")
+    runner = CliRunner()
+    local = runner.invoke(main, ["explain", "--db", str(db), "CARREFOUR"]).output
+
+    server = LedgerServer(("127.0.0.1", 0), Database(db))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    discovery = advertise(server, db)
+    try:
+        found, payload = query_server(db, "/explain", {"q": "CARREFOUR"})
+        assert found and payload["rule"] == "groceries"
+        assert query_server(db, "/explain", {"q": "nope"}) == (True, None)
+        _, rows = query_server(db, "/transactions", {"category": "Income"})
+        assert [r["description"] for r in rows] == ["SALARY"]
+        _, monthly = query_server(db, "/monthly", {"months": 12})
+        assert sum(r["count"] for r in monthly) == 2
+        served = runner.invoke(main, ["explain", "--db", str(db), "CARREFOUR"])
+        assert served.output == local
+    finally:
+        server.shutdown()
+        server.server_close()
+        discovery.unlink()
+    # Without a reachable server the client reports nothing was served.
+    assert query_server(db, "/explain", {"q": "CARREFOUR"}) == (False, None)
+    assert json.loads(local)["rule"] == "groceries"
+
+
+def test_server_error_returns_json_500(tmp_path: Path, monkeypatch) -> None:
+    database = Database(_import(tmp_path / "data"))
+
+    def broken(months: int = 12) -> None:
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(database, "monthly_totals", broken)
+    server = LedgerServer(("127.0.0.1", 0), database)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(str(host), port, timeout=5)
+    try:
+        conn.request("GET", "/monthly?months=12")
+        resp = conn.getresponse()
+        assert resp.status == 500
+        assert json.loads(resp.read()) == {"error": "Internal server error"}
+    finally:
+        conn.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_ingest_refreshes_only_touched_months(tmp_path: Path) -> None:
+    database = Database(_import(tmp_path / "data"))
+    more = database.read_all().head(1).copy()
+    more["id"] = "later"
+    more["date"] = "2025-03-14"
+    more["amount"] = -12.5
+    database.ingest_dataframe(more)
+
+    def totals() -> pd.DataFrame:
+        with database.engine.connect() as conn:
+            df = pd.read_sql("SELECT * FROM monthly_totals", conn)
+        return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+    incremental = totals()
+    assert "2025-03" in set(incremental["month"])
+    database.refresh_aggregates()
+    pd.testing.assert_frame_equal(incremental, totals())
+
+    # An empty batch touches no month and leaves the totals as they are.
+    assert database.ingest_dataframe(more.iloc[:0]) == 0
+    pd.testing.assert_frame_equal(incremental, totals())
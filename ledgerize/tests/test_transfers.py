@@ -0,0 +1,70 @@
+from datetime import date
+
+import pandas as pd
+
+from ledgerize.compact import compact_frame
+from ledgerize.transfers import detect_transfers
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": list("abcdefg"),
+            "account": [
+                "Checking",
+                "Savings",
+                "Savings",
+                "Checking",
+                "Checking",
+                "Checking",
+                "Savings",
+            ],
+            "date": [
+                date(2024, 1, 1),
+                date(2024, 1, 2),
+                date(2024, 1, 1),
+                date(2024, 2, 1),
+                date(2024, 2, 1),
+                date(2024, 3, 1),
+                date(2024, 3, 10),
+            ],
+            "amount": [-100.0, 100.0, 100.0, -50.0, 50.0, -20.0, 20.0],
+            "currency": ["EUR"] * 7,
+            "category": ["Misc"] * 7,
+            "rule_id": [None] * 7,
+        }
+    )
+
+
+def test_detect_transfers_pairs_closest_other_account():
+    out = detect_transfers(_frame(), window=3)
+    ids = out["transfer_id"].tolist()
+    # "a" pairs with the same-day inflow "c", leaving "b" unmatched.
+    assert ids[0] is not None and ids[0] == ids[2] and ids[1] is None
+    # Same account, or too far apart: not transfers.
+    assert ids[3:] == [None] * 4
+    assert out.loc[[0, 2], "category"].tolist() == ["Transfer", "Transfer"]
+    assert out.loc[1, "category"] == "Misc"
+
+
+def test_detect_transfers_compact():
+    out = detect_transfers(compact_frame(_frame()), window=10)
+    assert out["transfer_id"].notna().sum() == 4
+    assert set(out.loc[out["transfer_id"].notna(), "rule_id"]) == {"transfer"}
+
+
+def test_monthly_totals_leave_out_transfers(tmp_path):
+    from ledgerize.db import Database
+    from ledgerize.parquet_db import ParquetDatabase
+
+    frame = detect_transfers(_frame(), window=3)
+    frame["description"] = frame["norm_desc"] = frame["id"]
+    kept = int(frame["transfer_id"].isna().sum())
+    for db in (
+        Database(tmp_path / "ledgerize.db"),
+        ParquetDatabase(tmp_path / "ledgerize.parquet"),
+    ):
+        db.ingest_dataframe(frame)
+        totals = db.monthly_totals(12)
+        assert "Transfer" not in {r["category"] for r in totals}
+        assert sum(r["count"] for r in totals) == kept
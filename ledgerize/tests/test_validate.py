@@ -0,0 +1,37 @@
+from datetime import date
+
+import pandas as pd
+
+from ledgerize.compact import compact_frame
+from ledgerize.validate import validate_frame
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": ["a", "b", "c", "d", "e"],
+            "account": ["A"] * 5,
+            "date": [date(2024, 1, 1)] * 3 + [date(1900, 1, 1), date(2024, 1, 2)],
+            "amount": [1.0, float("nan"), 3.0, 4.0, 5.0],
+            "currency": ["EUR", "EUR", "eur", "EUR", "EUR"],
+            "description": ["x", "y", "z", "w", 42],
+            "norm_desc": ["X", "Y", "Z", "W", "42"],
+            "category": ["C"] * 5,
+        }
+    )
+
+
+def test_validate_frame_rejects_with_reasons() -> None:
+    valid, rejects = validate_frame(_frame())
+    assert valid["id"].tolist() == ["a"]
+    reasons = dict(zip(rejects["id"], rejects["reason"]))
+    assert reasons["b"] == "amount is null"
+    assert reasons["c"] == "invalid currency code"
+    assert reasons["d"] == "date out of range"
+    assert reasons["e"].startswith("description:")
+
+
+def test_validate_frame_compact() -> None:
+    valid, rejects = validate_frame(compact_frame(_frame().iloc[[0, 2]]))
+    assert valid["id"].tolist() == ["a"]
+    assert rejects["reason"].tolist() == ["invalid currency code"]
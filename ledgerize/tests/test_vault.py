@@ -1,5 +1,9 @@
 from pathlib import Path
 import os
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
 from ledgerize import vault
 
 
@@ -13,3 +17,38 @@ def test_vault_roundtrip(tmp_path: Path) -> None:
     out = tmp_path / "out"
     vault.unlock(vf, out, key)
     assert (out / "a.txt").read_text() == "hello"
+
+
+def test_read_member_in_memory(tmp_path: Path) -> None:
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.txt").write_text("hello")
+    key = os.urandom(32)
+    vf = tmp_path / "test.lzvault"
+    vault.lock(data, vf, key)
+    assert vault.read_member(vf, "a.txt", key) == b"hello"
+    with pytest.raises(ValueError, match="ledgerize.db"):
+        vault.load_database(vf, key)
+
+
+def test_wrong_key_and_tampered_vault(tmp_path: Path) -> None:
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.txt").write_text("hello")
+    key = os.urandom(32)
+    vf = tmp_path / "test.lzvault"
+    vault.lock(data, vf, key)
+    with pytest.raises(InvalidTag):
+        vault.read_member(vf, "a.txt", os.urandom(32))
+
+    raw = bytearray(vf.read_bytes())
+    raw[-1] ^= 1
+    tampered = tmp_path / "tampered.lzvault"
+    tampered.write_bytes(bytes(raw))
+    with pytest.raises(InvalidTag):
+        vault.unlock(tampered, tmp_path / "out", key)
+    assert not (tmp_path / "out").exists()
+
+    tampered.write_bytes(b"not a vault")
+    with pytest.raises(ValueError, match="invalid vault file"):
+        vault.load_database(tampered, key)
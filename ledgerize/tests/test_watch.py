@@ -0,0 +1,62 @@
+import shutil
+from pathlib import Path
+
+from ledgerize.config import load_accounts, load_rules
+from ledgerize.db import Database
+from ledgerize.watch import Watcher
+
+BASE = Path(__file__).resolve().parent.parent
+
+
+def _watcher(inbox: Path, out: Path) -> Watcher:
+    return Watcher(
+        inbox,
+        Database(out / "ledgerize.db"),
+        load_rules(BASE / "samples/rules.yml"),
+        load_accounts(BASE / "samples/accounts.yml"),
+        settle=0,
+    )
+
+
+def test_watch_ingests_new_and_modified_files(tmp_path: Path) -> None:
+    inbox = tmp_path / "inbox"
+    out = tmp_path / "data"
+    inbox.mkdir()
+    out.mkdir()
+    csv = inbox / "n26_2025-06.csv"
+    shutil.copy(BASE / "samples/n26_2025-06.csv", csv)
+
+    watcher = _watcher(inbox, out)
+    [result] = watcher.poll_once()
+    assert (result.rows, result.written) == (2, 2)
+    assert watcher.poll_once() == []
+
+    with csv.open("a") as fh:
+        fh.write("2025-06-07;MONOPRIX;DE123;-9.99;EUR\n")
+    # A restarted watcher picks up the persisted state.
+    [result] = _watcher(inbox, out).poll_once()
+    assert (result.rows, result.written) == (3, 1)
+    assert len(Database(out / "ledgerize.db").read_transactions(12)) == 3
+
+
+def test_watch_waits_for_settle(tmp_path: Path) -> None:
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    shutil.copy(BASE / "samples/n26_2025-06.csv", inbox / "n26.csv")
+    watcher = _watcher(inbox, tmp_path)
+    watcher.settle = 3600
+    assert watcher.pending() == []
+
+
+def test_watch_skips_files_that_vanish(tmp_path: Path) -> None:
+    inbox = tmp_path / "inbox"
+    out = tmp_path / "data"
+    inbox.mkdir()
+    out.mkdir()
+    shutil.copy(BASE / "samples/n26_2025-06.csv", inbox / "n26_2025-06.csv")
+    # Listed by the directory scan, but stat() fails like a file removed
+    # between the listing and the check.
+    (inbox / "gone.csv").symlink_to(inbox / "missing.csv")
+
+    [result] = _watcher(inbox, out).poll_once()
+    assert result.path.name == "n26_2025-06.csv"